@@ -0,0 +1,168 @@
+"""Local SQLite ledger of every model, file and release created through `BailoBoilerplateClient`.
+
+Each artefact is tagged with the experiment name and a run ID so that everything a run created can be found and torn
+down afterwards with `teardown.py`. The ledger is opt-in: set `LEDGER_FILE` in the dotenv file (e.g. to
+`artefact_ledger.sqlite`, the file `teardown.py` reads by default) to enable it. The experiment name defaults to the
+script name and the run ID is generated once per run, and both can be set with `LEDGER_EXPERIMENT` and `LEDGER_RUN_ID`.
+"""
+
+from __future__ import annotations
+
+import datetime
+import os
+import re
+import sqlite3
+import sys
+import threading
+import uuid
+from contextlib import closing
+from typing import Any
+
+from tracing import HttpCall
+
+DEFAULT_LEDGER_FILE = "artefact_ledger.sqlite"
+# deletion order, so that children are deleted before their parents
+KINDS = ["release", "file", "model"]
+
+_CREATE_PATHS = [
+    (re.compile(r"^/v2/models$"), "model"),
+    (re.compile(r"^/v2/model/(?P<model_id>[^/]+)/files/upload/(simple|multipart/finish)$"), "file"),
+    (re.compile(r"^/v2/model/(?P<model_id>[^/]+)/releases$"), "release"),
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artefacts (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    experiment TEXT NOT NULL,
+    base_url TEXT NOT NULL DEFAULT '',
+    kind TEXT NOT NULL,
+    model_id TEXT NOT NULL,
+    artefact_id TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    deleted_at TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS artefacts_run_id ON artefacts (run_id, kind);
+"""
+
+
+def get_run_id() -> str:
+    """Get the run ID from `LEDGER_RUN_ID`, generating and setting it if needed so that any child processes share it.
+
+    :return: The run ID.
+    """
+    if not os.getenv("LEDGER_RUN_ID"):
+        os.environ["LEDGER_RUN_ID"] = f"{datetime.datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+    return os.environ["LEDGER_RUN_ID"]
+
+
+def now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+class ArtefactLedger:
+    """Record artefacts created by agent HTTP calls in a SQLite database."""
+
+    def __init__(self, ledger_file: str, base_url: str, experiment: str | None = None, run_id: str | None = None):
+        """
+        :param ledger_file: Path of the SQLite database.
+        :param base_url: Client URL to strip from request URLs, which is recorded so artefacts are only torn down from
+            the server they were created on.
+        :param experiment: Experiment name, defaults to None in which case `LEDGER_EXPERIMENT` or the script name is
+            used.
+        :param run_id: Run ID, defaults to None in which case `get_run_id` is used.
+        """
+        self.ledger_file = ledger_file
+        self.base_url = base_url
+        self.experiment = experiment or os.getenv("LEDGER_EXPERIMENT") or os.path.basename(sys.argv[0])
+        self.run_id = run_id or get_run_id()
+        self._lock = threading.Lock()
+        with self.connect() as conn, conn:
+            conn.executescript(_SCHEMA)
+            # ledgers created before the base URL was recorded
+            if "base_url" not in {column[1] for column in conn.execute("PRAGMA table_info(artefacts)")}:
+                conn.execute("ALTER TABLE artefacts ADD COLUMN base_url TEXT NOT NULL DEFAULT ''")
+
+    def connect(self) -> closing[sqlite3.Connection]:
+        """Open a new connection, as connections cannot be shared between threads or processes.
+
+        :return: A connection which is closed when used as a context manager.
+        """
+        conn = sqlite3.connect(self.ledger_file, timeout=60)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return closing(conn)
+
+    def add(self, kind: str, model_id: str, artefact_id: str) -> None:
+        """Record a created artefact.
+
+        :param kind: One of `KINDS`.
+        :param model_id: Model the artefact belongs to (or is, for models).
+        :param artefact_id: File ID, release semver, or model ID.
+        """
+        with self._lock, self.connect() as conn, conn:
+            conn.execute(
+                "INSERT INTO artefacts (run_id, experiment, base_url, kind, model_id, artefact_id, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.run_id, self.experiment, self.base_url, kind, model_id, artefact_id, now()),
+            )
+
+    def record_http(self, call: HttpCall) -> None:
+        """Observer for `instrument_agent` which records any artefact created by the call.
+
+        :param call: The completed HTTP call.
+        """
+        if call.method != "POST" or call.response is None or call.response.status_code >= 400:
+            return
+        path = call.url.removeprefix(self.base_url).split("?", 1)[0]
+        for path_regex, kind in _CREATE_PATHS:
+            match = path_regex.match(path)
+            if match is None:
+                continue
+            body: dict[str, Any] = call.response.json()
+            if kind == "model":
+                model_id = body["model"]["id"]
+                self.add(kind, model_id, model_id)
+            elif kind == "file":
+                self.add(kind, match["model_id"], body["file"].get("id", body["file"].get("_id")))
+            else:
+                self.add(kind, match["model_id"], body["release"]["semver"])
+            return
+
+    def get_runs(self) -> list[tuple[str, str, str, int, int, str]]:
+        """Summarise every run in the ledger.
+
+        :return: List of (run ID, experiments, base URLs, artefact count, remaining count, first created) in creation
+            order.
+        """
+        with self.connect() as conn:
+            return conn.execute(
+                "SELECT run_id, GROUP_CONCAT(DISTINCT experiment), GROUP_CONCAT(DISTINCT base_url), COUNT(*),"
+                " COUNT(*) - COUNT(deleted_at), MIN(created_at) FROM artefacts GROUP BY run_id ORDER BY MIN(created_at)"
+            ).fetchall()
+
+    def get_remaining(self, run_id: str, kind: str) -> list[tuple[int, str, str, str]]:
+        """Get the artefacts of a run that have not been deleted yet, from every server the run created them on.
+
+        :param run_id: Run ID.
+        :param kind: One of `KINDS`.
+        :return: List of (row ID, base URL, model ID, artefact ID).
+        """
+        with self.connect() as conn:
+            return conn.execute(
+                "SELECT id, base_url, model_id, artefact_id FROM artefacts"
+                " WHERE run_id = ? AND kind = ? AND deleted_at IS NULL",
+                (run_id, kind),
+            ).fetchall()
+
+    def mark_deleted(self, row_id: int, error: str | None = None) -> None:
+        """Mark an artefact as deleted, or record why it could not be deleted.
+
+        :param row_id: Row ID from `get_remaining`.
+        :param error: Error message if the deletion failed, defaults to None.
+        """
+        with self._lock, self.connect() as conn, conn:
+            if error is None:
+                conn.execute("UPDATE artefacts SET deleted_at = ?, error = NULL WHERE id = ?", (now(), row_id))
+            else:
+                conn.execute("UPDATE artefacts SET error = ? WHERE id = ?", (error, row_id))
@@ -4,41 +4,79 @@ from __future__ import annotations
 
 import datetime
 import os
+import subprocess
 import time
+from typing import Any
 
+from artefact_ledger import ArtefactLedger
 from bailo import Agent, Client, Model, TokenAgent
 from bailo.core.exceptions import BailoException
-from dotenv import load_dotenv, set_key
+from dotenv import dotenv_values, set_key
 from semantic_version import Version
+from tracing import Tracer, get_tracer, instrument_agent
+from traffic_recorder import TrafficRecorder, get_recorder
 
 
 class BailoBoilerplateClient:
     """Simple Bailo client wrapper that reads in `ACCESS_KEY`, `SECRET_KEY` and `URL` from a dotenv file.
     Automatically creates a `TokenAgent` if both `ACCESS_KEY` and `SECRET_KEY` are supplied, otherwise uses the default `Agent`.
+    Optionally traces every agent HTTP call and subprocess if `TRACE_FILE` is set (see `tracing.py`),
+    records every agent HTTP call for replaying if `RECORD_FILE` is set (see `traffic_recorder.py`),
+    and writes every created model, file and release to the artefact ledger if `LEDGER_FILE` is set
+    (see `artefact_ledger.py`).
     """
 
-    def __init__(self, dotenv_file: str = ".local.env"):
+    def __init__(
+        self,
+        dotenv_file: str = ".local.env",
+        trace_file: str | None = None,
+        record_file: str | None = None,
+        ledger_file: str | None = None,
+    ):
         """_summary_
 
         :param dotenv_file: dotenv file to load in, defaults to ".local.env"
+        :param trace_file: Chrome trace file to write to, defaults to None in which case `TRACE_FILE` is used if set.
+        :param record_file: Recording file to write to, defaults to None in which case `RECORD_FILE` is used if set.
+        :param ledger_file: Artefact ledger to write to, defaults to None in which case `LEDGER_FILE` is used if set.
         :raises ValueError: error if `URL` not found.
         """
         self._dotenv_file = dotenv_file
-        load_dotenv(self._dotenv_file)
+        # kept per client rather than loaded into `os.environ`, so clients of different dotenv files don't share values
+        self._env = dotenv_values(self._dotenv_file)
 
-        access_key = os.getenv("ACCESS_KEY")
-        secret_key = os.getenv("SECRET_KEY")
+        access_key = self.getenv("ACCESS_KEY")
+        secret_key = self.getenv("SECRET_KEY")
         if access_key and secret_key:
             self._agent = TokenAgent(access_key, secret_key)
         else:
             self._agent = Agent()
 
-        client_url = os.getenv("URL")
+        client_url = self.getenv("URL")
         if not client_url:
             raise ValueError("Could not get URL from env")
 
         self._client = Client(client_url, self.agent)
 
+        http_observers = []
+        trace_file = trace_file or self.getenv("TRACE_FILE")
+        self._tracer = None
+        if trace_file:
+            self._tracer = get_tracer(trace_file, self.client.url)
+            http_observers.append(self._tracer.record_http)
+        record_file = record_file or self.getenv("RECORD_FILE")
+        self._recorder = None
+        if record_file:
+            self._recorder = get_recorder(record_file, self.client.url)
+            http_observers.append(self._recorder.record_http)
+        ledger_file = ledger_file or self.getenv("LEDGER_FILE")
+        self._ledger = None
+        if ledger_file:
+            self._ledger = ArtefactLedger(ledger_file, self.client.url)
+            http_observers.append(self._ledger.record_http)
+        if http_observers:
+            instrument_agent(self.agent, http_observers)
+
     def get_or_create_model(
         self, model_id_env_var, model_name=None, model_description=None, model_card_schema=None
     ) -> Model:
@@ -50,7 +88,7 @@ class BailoBoilerplateClient:
         :param model_card_schema: Model card schema to set if creating, defaults to None.
         :return: The found or created Model object.
         """
-        model_id = os.getenv(model_id_env_var)
+        model_id = self.getenv(model_id_env_var)
         try:
             # try to load from an existing model
             model = Model.from_id(self.client, model_id)
@@ -67,11 +105,30 @@ class BailoBoilerplateClient:
                 model_name,
                 model_description,
             )
-            set_key(self.dotenv_file, model_id_env_var, model.model_id)
+            self.setenv(model_id_env_var, model.model_id)
             model.card_from_schema(model_card_schema)
             print(f"Created model {model.model_id} with schema {model_card_schema}")
             return model
 
+    def getenv(self, key: str, default: str | None = None) -> str | None:
+        """Get a variable from the environment, falling back to this client's dotenv file.
+
+        :param key: Name of the variable.
+        :param default: Value if the variable is in neither, defaults to None.
+        :return: The value of the variable.
+        """
+        value = os.environ.get(key, self._env.get(key))
+        return default if value is None else value
+
+    def setenv(self, key: str, value: str) -> None:
+        """Save a variable to this client's dotenv file, so later runs and `getenv` in this run both see it.
+
+        :param key: Name of the variable.
+        :param value: Value to save.
+        """
+        set_key(self.dotenv_file, key, value)
+        self._env[key] = value
+
     @staticmethod
     def get_next_model_version(model: Model, next_func: str = "next_major") -> Version:
         """Get the next available version for a model. Defaults to 0.0.0 if no releases found.
@@ -94,6 +151,17 @@ class BailoBoilerplateClient:
             pass
         return version
 
+    def run_subprocess(self, args: list[str], **kwargs: Any) -> subprocess.CompletedProcess:
+        """Run a subprocess, tracing it if tracing is enabled.
+
+        :param args: Command to run.
+        :param kwargs: Keyword arguments to `subprocess.run`.
+        :return: The completed process.
+        """
+        if self.tracer:
+            return self.tracer.run_subprocess(args, **kwargs)
+        return subprocess.run(args, check=kwargs.pop("check", False), **kwargs)
+
     @property
     def dotenv_file(self):
         return self._dotenv_file
@@ -106,6 +174,18 @@ class BailoBoilerplateClient:
     def client(self):
         return self._client
 
+    @property
+    def tracer(self) -> Tracer | None:
+        return self._tracer
+
+    @property
+    def recorder(self) -> TrafficRecorder | None:
+        return self._recorder
+
+    @property
+    def ledger(self) -> ArtefactLedger | None:
+        return self._ledger
+
 
 class LazyStream:
     """
@@ -8,7 +8,6 @@ from __future__ import annotations
 
 import json
 import math
-import os
 import subprocess
 import time
 
@@ -16,18 +15,30 @@ from bailo.core.exceptions import BailoException, ResponseException
 from bailo.helper.model import Model
 from bailo.helper.release import Release
 from boilerplate_client import BailoBoilerplateClient, LazyStream
-from dotenv import set_key
 
 SOURCE_MODEL_ID_ENV_VAR = "CLONE_RELEASES_SOURCE_MODEL_ID"
 DESTINATION_MODEL_ID_ENV_VAR = "CLONE_RELEASES_DESTINATION_MODEL_ID"
 DUMPED_FILE_ENV_VAR = "CLONE_RELEASES_ENDPOINT_DUMP"
 
 
-if __name__ == "__main__":
-    boilerplate_client = BailoBoilerplateClient()
+def run(
+    boilerplate_client: BailoBoilerplateClient,
+    *,
+    source_model_id_env_var: str = SOURCE_MODEL_ID_ENV_VAR,
+    destination_model_id_env_var: str = DESTINATION_MODEL_ID_ENV_VAR,
+    dumped_file_env_var: str = DUMPED_FILE_ENV_VAR,
+) -> None:
+    """Clone the releases of the source model (or a dump of them) to the destination model.
+
+    :param boilerplate_client: Client to create the artefacts with.
+    :param source_model_id_env_var: Env var holding the source model ID, defaults to SOURCE_MODEL_ID_ENV_VAR.
+    :param destination_model_id_env_var: Env var holding the destination model ID, defaults to
+        DESTINATION_MODEL_ID_ENV_VAR.
+    :param dumped_file_env_var: Env var holding the path of the dumped releases, defaults to DUMPED_FILE_ENV_VAR.
+    """
     client = boilerplate_client.client
     experiment_model = boilerplate_client.get_or_create_model(
-        DESTINATION_MODEL_ID_ENV_VAR,
+        destination_model_id_env_var,
         "Clone Releases Test",
         "A model with releases matching those of a model's releases endpoint response.",
     )
@@ -35,7 +46,7 @@ if __name__ == "__main__":
 
     # read file from path if possible, else GET then dump
     # allows for loading edited JSON files if wanted
-    dumped_file_path = os.getenv(DUMPED_FILE_ENV_VAR)
+    dumped_file_path = boilerplate_client.getenv(dumped_file_env_var)
     clone_releases_template = None
     try:
         # try to load from an existing file
@@ -43,7 +54,7 @@ if __name__ == "__main__":
             clone_releases_template = json.load(dumped_file)
     except OSError:
         # get source model
-        source_model_id = os.getenv(SOURCE_MODEL_ID_ENV_VAR)
+        source_model_id = boilerplate_client.getenv(source_model_id_env_var)
         source_model = Model.from_id(client, model_id)
         print(f"Found model {source_model.model_id}")
         # get releases
@@ -52,11 +63,19 @@ if __name__ == "__main__":
         dumped_file_path = f"tmp/{source_model.model_id}_releases.json"
         with open(dumped_file_path, "w", encoding="utf-8") as dumped_file:
             dumped_file.write(clone_releases_template)
-        set_key(boilerplate_client.dotenv_file, DUMPED_FILE_ENV_VAR, dumped_file_path)
+        boilerplate_client.setenv(dumped_file_env_var, dumped_file_path)
 
     trimmed_client_url = client.url.removeprefix("http://").removeprefix("https://").removesuffix("/api")
-    subprocess.run(
-        ["docker", "login", trimmed_client_url, "-u", os.getenv("ACCESS_KEY"), "-p", os.getenv("SECRET_KEY")],
+    boilerplate_client.run_subprocess(
+        [
+            "docker",
+            "login",
+            trimmed_client_url,
+            "-u",
+            boilerplate_client.getenv("ACCESS_KEY"),
+            "-p",
+            boilerplate_client.getenv("SECRET_KEY"),
+        ],
         check=True,
     )
 
@@ -104,7 +123,7 @@ if __name__ == "__main__":
             try:
                 # read from bailo instance
                 data = json.loads(
-                    subprocess.run(
+                    boilerplate_client.run_subprocess(
                         ["docker", "manifest", "inspect", "-v", source_image_name_full],
                         text=True,
                         check=True,
@@ -116,7 +135,7 @@ if __name__ == "__main__":
                 # read from other source e.g. docker hub
                 # useful as getting the manifest requires image pull permission, so this is just a backup
                 data = json.loads(
-                    subprocess.run(
+                    boilerplate_client.run_subprocess(
                         ["docker", "manifest", "inspect", "-v", image_name_short],
                         text=True,
                         check=True,
@@ -143,7 +162,7 @@ if __name__ == "__main__":
             print(f"Generating new docker image size {image_size=}")
             # size is approximate due to how docker layers & metadata works
             image_name_full = f"{trimmed_client_url}/{model_id}/{image_name_short}"
-            subprocess.run(
+            boilerplate_client.run_subprocess(
                 [
                     "docker",
                     "build",
@@ -160,9 +179,9 @@ if __name__ == "__main__":
                 check=True,
             )
             print(f"Pushing docker image {image_name_full=}")
-            subprocess.run(["docker", "push", image_name_full], check=True)
+            boilerplate_client.run_subprocess(["docker", "push", image_name_full], check=True)
             print(f"Untagging docker image {image_name_full=}")
-            subprocess.run(["docker", "rmi", image_name_full], check=True)
+            boilerplate_client.run_subprocess(["docker", "rmi", image_name_full], check=True)
             release_images.append({"repository": model_id, "name": source_image["name"], "tag": source_image["tag"]})
 
         print(
@@ -179,3 +198,7 @@ if __name__ == "__main__":
             minor=source_release["minor"],
             draft=source_release["draft"],
         )
+
+
+if __name__ == "__main__":
+    run(BailoBoilerplateClient())
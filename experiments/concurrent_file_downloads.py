@@ -0,0 +1,202 @@
+"""Concurrently download every file in a model's releases to measure download throughput and latency.
+Each response is streamed into a SHA-256 hash rather than to disk, so arbitrarily large files can be downloaded.
+Interrupted downloads are resumed with a `Range` request where the server supports it, and a byte range of each file can
+be read instead of the whole file.
+Uses env var `DOWNLOADS_MODEL_ID` to load the model to download from."""
+
+from __future__ import annotations
+
+import hashlib
+import statistics
+import time
+from dataclasses import dataclass
+from itertools import repeat
+
+import requests
+from bailo import TokenAgent
+from bailo.core.exceptions import BailoException, ResponseException
+from boilerplate_client import BailoBoilerplateClient
+from stats import percentile
+from worker_pool import WorkerPool
+
+MODEL_ID_ENV_VAR = "DOWNLOADS_MODEL_ID"
+MAX_WORKERS = 8
+CHUNK_SIZE = 1024**2  # 1MB
+MAX_RESUMES = 3
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of downloading a single file."""
+
+    file_id: str
+    name: str
+    expected_bytes: int
+    bytes_read: int = 0
+    sha256: str = ""
+    time_to_first_byte: float = 0.0
+    duration: float = 0.0
+    resumes: int = 0
+    error: str | None = None
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second."""
+        return self.bytes_read / self.duration if self.duration else 0.0
+
+
+def get_download_url(boilerplate_client: BailoBoilerplateClient, model_id: str, file_id: str) -> str:
+    """Get the same download URL as `Client.get_download_file`, which cannot send a `Range` header itself.
+
+    :param boilerplate_client: Client to download with.
+    :param model_id: Model ID.
+    :param file_id: File ID.
+    :return: Download URL of the file.
+    """
+    client = boilerplate_client.client
+    if isinstance(boilerplate_client.agent, TokenAgent):
+        return f"{client.url}/v2/token/model/{model_id}/file/{file_id}/download"
+    return f"{client.url}/v2/model/{model_id}/file/{file_id}/download"
+
+
+def download_file(
+    boilerplate_client: BailoBoilerplateClient,
+    model_id: str,
+    file: dict,
+    chunk_size: int = CHUNK_SIZE,
+    range_start: int = 0,
+    range_length: int | None = None,
+    max_resumes: int = MAX_RESUMES,
+) -> DownloadResult:
+    """Stream a file into a SHA-256 hash, resuming from the last byte read if the stream is interrupted.
+
+    :param boilerplate_client: Client to download with.
+    :param model_id: Model ID.
+    :param file: File object from `client.get_files`.
+    :param chunk_size: Number of bytes to read at a time, defaults to CHUNK_SIZE.
+    :param range_start: First byte to read, defaults to 0.
+    :param range_length: Number of bytes to read, defaults to None in which case the rest of the file is read.
+    :param max_resumes: Number of times to resume an interrupted download, defaults to MAX_RESUMES.
+    :return: Result of the download.
+    """
+    file_id = file.get("id", file.get("_id"))
+    range_start = min(range_start, file["size"])
+    range_end = file["size"] if range_length is None else min(file["size"], range_start + range_length)
+    result = DownloadResult(file_id, file["name"], range_end - range_start)
+    url = get_download_url(boilerplate_client, model_id, file_id)
+    sha256 = hashlib.sha256()
+
+    start = time.perf_counter()
+    supports_ranges = True
+    while result.bytes_read < result.expected_bytes:
+        offset = range_start + result.bytes_read
+        headers = {}
+        if offset > 0 or range_end < file["size"]:
+            headers["Range"] = f"bytes={offset}-{range_end - 1}"
+        try:
+            with boilerplate_client.agent.get(url, headers=headers, stream=True, timeout=10_000) as response:
+                # servers that ignore the Range header send the whole file, so skip to the offset ourselves
+                skip = offset if response.status_code != 206 else 0
+                supports_ranges = response.status_code == 206 or response.headers.get("Accept-Ranges") == "bytes"
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if not result.time_to_first_byte:
+                        result.time_to_first_byte = time.perf_counter() - start
+                    if skip:
+                        skipped = min(skip, len(chunk))
+                        chunk = chunk[skipped:]
+                        skip -= skipped
+                    chunk = chunk[: result.expected_bytes - result.bytes_read]
+                    sha256.update(chunk)
+                    result.bytes_read += len(chunk)
+                    if result.bytes_read >= result.expected_bytes:
+                        break
+            if result.bytes_read < result.expected_bytes:
+                raise requests.exceptions.ChunkedEncodingError("Response ended early")
+        except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError) as e:
+            if not supports_ranges or result.resumes >= max_resumes:
+                result.error = f"Interrupted after {result.bytes_read:_} bytes: {e}"
+                break
+            result.resumes += 1
+            print(f"Resuming {result.name} from byte {range_start + result.bytes_read:_}")
+        except (BailoException, ResponseException) as e:
+            result.error = str(e)
+            break
+
+    result.duration = time.perf_counter() - start
+    result.sha256 = sha256.hexdigest()
+    return result
+
+
+def run(
+    boilerplate_client: BailoBoilerplateClient,
+    *,
+    model_id_env_var: str = MODEL_ID_ENV_VAR,
+    max_workers: int = MAX_WORKERS,
+    chunk_size: int = CHUNK_SIZE,
+    range_start: int = 0,
+    range_length: int | None = None,
+    max_resumes: int = MAX_RESUMES,
+) -> list[DownloadResult]:
+    """Download every file in the model's releases with up to `max_workers` downloads at once.
+
+    :param boilerplate_client: Client used to list the files. Each download worker builds its own client from the same
+        dotenv file.
+    :param model_id_env_var: Env var holding the model ID, defaults to MODEL_ID_ENV_VAR.
+    :param max_workers: Number of concurrent downloads, defaults to MAX_WORKERS.
+    :param chunk_size: Number of bytes to read at a time, defaults to CHUNK_SIZE.
+    :param range_start: First byte of each file to read, defaults to 0.
+    :param range_length: Number of bytes of each file to read, defaults to None in which case the rest of the file is
+        read.
+    :param max_resumes: Number of times to resume each interrupted download, defaults to MAX_RESUMES.
+    :return: Result of each download.
+    """
+    client = boilerplate_client.client
+    model_id = boilerplate_client.getenv(model_id_env_var)
+    if not model_id:
+        raise Exception(f"Env var {model_id_env_var} not set")
+
+    files_by_id = {file.get("id", file.get("_id")): file for file in client.get_files(model_id)["files"]}
+    release_file_ids = {
+        file_id for release in client.get_all_releases(model_id)["releases"] for file_id in release["fileIds"]
+    }
+    files = [files_by_id[file_id] for file_id in release_file_ids if file_id in files_by_id]
+    print(f"Downloading {len(files)} files totalling {sum(file['size'] for file in files):_} bytes")
+
+    start = time.perf_counter()
+    results = []
+    with WorkerPool(max_workers, boilerplate_client.dotenv_file) as pool:
+        for result in pool.map(
+            download_file,
+            repeat(model_id),
+            files,
+            repeat(chunk_size),
+            repeat(range_start),
+            repeat(range_length),
+            repeat(max_resumes),
+        ):
+            status = result.error or f"sha256 {result.sha256[:12]}"
+            print(
+                f"{result.name}: {result.bytes_read:_} bytes in {result.duration:.2f}s "
+                f"({result.throughput / 1024**2:.1f} MB/s, first byte {result.time_to_first_byte * 1000:.0f}ms, "
+                f"{result.resumes} resumes) {status}"
+            )
+            results.append(result)
+    wall_time = time.perf_counter() - start
+
+    succeeded = [result for result in results if result.error is None]
+    if succeeded:
+        total_bytes = sum(result.bytes_read for result in results)
+        durations = [result.duration for result in succeeded]
+        first_bytes = [result.time_to_first_byte for result in succeeded]
+        print(f"Downloaded {total_bytes:_} bytes in {wall_time:.2f}s ({total_bytes / wall_time / 1024**2:.1f} MB/s)")
+        print(f"Duration p50 {statistics.median(durations):.2f}s p99 {percentile(durations, 0.99):.2f}s")
+        print(
+            f"First byte p50 {statistics.median(first_bytes) * 1000:.0f}ms "
+            f"p99 {percentile(first_bytes, 0.99) * 1000:.0f}ms"
+        )
+    print(f"{len(succeeded)}/{len(results)} files downloaded successfully")
+    return results
+
+
+if __name__ == "__main__":
+    run(BailoBoilerplateClient())
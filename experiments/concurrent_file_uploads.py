@@ -4,59 +4,59 @@ Uses env var `CONCURRENCY_MODEL_ID` to save and load the same model for testing.
 
 from __future__ import annotations
 
-from concurrent.futures import ProcessPoolExecutor
 from itertools import repeat
-from os import getenv
 
 from bailo import Model
 from bailo.core.exceptions import BailoException
-from boilerplate_client import BailoBoilerplateClient, LazyStream
-from dotenv import set_key
+from boilerplate_client import BailoBoilerplateClient
+from metrics import Metrics, MetricsReporter
+from worker_pool import WorkerPool, upload_task
 
 
 def upload_file(
+    boilerplate_client: BailoBoilerplateClient,
     process_count: int,
     file_size: int,
-    model_id_env_var: str = "CONCURRENCY_MODEL_ID",
-    dotenv_file: str = ".local.env",
+    model_id: str,
 ) -> int:
-    """Thread/process safe way to upload a BytesIO object of `file_size` bytes.
+    """Pool task to upload a LazyStream of `file_size` bytes using the worker's client.
 
-    :param process_count: ID of this process
-    :param file_size: the size of the BytesIO object to create
-    :param random_bytes: whether to randomise the byte values in the BytesIO object, defaults to False (uses all 0s)
-    :param model_id_env_var: Env var to read to get the model ID, defaults to "CONCURRENCY_MODEL_ID"
-    :param dotenv_file: dotenv filename to load for the boilerplate client, defaults to ".local.env"
-    :return: ID of the process
+    :param boilerplate_client: Client of the pool worker running this task
+    :param process_count: ID of this upload
+    :param file_size: the size of the LazyStream object to upload
+    :param model_id: Model to upload to
+    :return: ID of the upload
     """
-    print(f"Starting {process_count}")
-    # pylint: disable=redefined-outer-name
-    boilerplate_client = BailoBoilerplateClient(dotenv_file=dotenv_file)
-    client = boilerplate_client.client
-    model_id = getenv(model_id_env_var)
-    # pylint: enable=redefined-outer-name
-
-    client.simple_upload(
-        model_id,
-        "test" + str(process_count),
-        LazyStream(total_size=file_size),
-    )
-    print(f"Finished {process_count}")
+    upload_task(boilerplate_client, model_id, "test" + str(process_count), file_size)
     return process_count
 
 
-if __name__ == "__main__":
-    # IMPORTANT: be careful balancing these numbers others your machine may run out of RAM
-    MAX_WORKERS = 8
-    FILE_SIZE = 1024 * 1024 * 20  # 20MB
-    UPLOAD_COUNT = 64
-    MODEL_ID_ENV_VAR = "CONCURRENCY_MODEL_ID"
-    DOTENV_FILE = ".local.env"
+# IMPORTANT: be careful balancing these numbers others your machine may run out of RAM
+MAX_WORKERS = 8
+FILE_SIZE = 1024 * 1024 * 20  # 20MB
+UPLOAD_COUNT = 64
+MODEL_ID_ENV_VAR = "CONCURRENCY_MODEL_ID"
+
+
+def run(
+    boilerplate_client: BailoBoilerplateClient,
+    *,
+    max_workers: int = MAX_WORKERS,
+    file_size: int = FILE_SIZE,
+    upload_count: int = UPLOAD_COUNT,
+    model_id_env_var: str = MODEL_ID_ENV_VAR,
+) -> None:
+    """Upload `upload_count` files of `file_size` bytes using `max_workers` processes.
 
+    :param boilerplate_client: Client used to find or create the model.
+    :param max_workers: Number of upload processes, defaults to MAX_WORKERS.
+    :param file_size: Size of each file in bytes, defaults to FILE_SIZE.
+    :param upload_count: Number of files to upload, defaults to UPLOAD_COUNT.
+    :param model_id_env_var: Env var holding the model ID, defaults to MODEL_ID_ENV_VAR.
+    """
     # check if a model already exists, and if not then create it
-    boilerplate_client = BailoBoilerplateClient(dotenv_file=DOTENV_FILE)
     client = boilerplate_client.client
-    model_id = getenv(MODEL_ID_ENV_VAR)
+    model_id = boilerplate_client.getenv(model_id_env_var)
     try:
         # try to load from an existing model
         Model.from_id(client, model_id)
@@ -65,18 +65,25 @@ if __name__ == "__main__":
         test_model = Model.create(
             client, "Concurrent-uploads-test", "A simple model for testing uploading many files simultaneously."
         )
-        set_key(boilerplate_client.dotenv_file, MODEL_ID_ENV_VAR, test_model.model_id)
+        boilerplate_client.setenv(model_id_env_var, test_model.model_id)
         test_model.card_from_schema()
-    # cleanup no-longer required objects
-    del boilerplate_client, client, model_id
+        model_id = test_model.model_id
 
-    # main upload loop
-    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        for x in executor.map(
+    # main upload loop, where each worker process builds its client once and reuses it for every upload,
+    # reporting progress, throughput and errors on one live line rather than printing from every worker
+    metrics = Metrics()
+    with (
+        MetricsReporter(metrics, total=upload_count, snapshot_file=boilerplate_client.getenv("METRICS_FILE")),
+        WorkerPool(max_workers, boilerplate_client.dotenv_file, use_processes=True, metrics=metrics) as pool,
+    ):
+        for _ in pool.map(
             upload_file,
-            range(UPLOAD_COUNT),
-            repeat(FILE_SIZE, UPLOAD_COUNT),
-            repeat(MODEL_ID_ENV_VAR, UPLOAD_COUNT),
-            repeat(DOTENV_FILE, UPLOAD_COUNT),
+            range(upload_count),
+            repeat(file_size, upload_count),
+            repeat(model_id, upload_count),
         ):
-            print(f"Process {x} returned")
+            pass
+
+
+if __name__ == "__main__":
+    run(BailoBoilerplateClient(dotenv_file=".local.env"))
@@ -0,0 +1,310 @@
+"""Measure how the cost of exporting a model for mirroring scales with the size of the model.
+For each step a fresh model is built from a release fixture (see `release_fixtures.py`) where one dimension (release
+count, files per release, file size or images per release) takes the step's value, and then the model is exported to
+S3 with `POST /api/v2/model/{modelId}/export/s3` `repeats` times. A power law is fitted to the median export times, so
+an exponent near 1 means export cost grows linearly with that dimension and a larger exponent means it grows faster.
+
+Bailo responds to the export request before it has finished uploading the archive to S3, so each export is timed
+until a new or changed object appears in the export bucket (`EXPORT_BUCKET`, optionally under `export_prefix`). S3
+objects only become visible once their upload completes. The bucket is listed with the AWS CLI, which must be installed
+and configured with credentials for the bucket (and `S3_ENDPOINT_URL` set when using e.g. MinIO), and each time is
+rounded up to the next listing so carries up to `poll_interval` seconds of error. Each model's mirror destination is set
+before exporting, as Bailo refuses to export a model without one.
+
+Images require docker installed on the host OS: `base_image` is pulled once and pushed to each model under a new name.
+The fixture models are recorded in the artefact ledger if `LEDGER_FILE` is set, so can be deleted afterwards with
+`teardown.py`."""
+
+from __future__ import annotations
+
+import json
+import math
+import statistics
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from bailo import Model
+from boilerplate_client import BailoBoilerplateClient
+from release_fixtures import MAX_WORKERS, FileSpec, FixtureSpec, ImageSpec, ReleaseSpec, reconcile
+
+MODEL_NAME_PREFIX = "Export-Benchmark"
+SCALE_BY = "release_count"
+SCALE_VALUES = [1, 2, 4, 8, 16, 32]
+RELEASE_COUNT = 4
+FILES_PER_RELEASE = 2
+FILE_SIZE = 1024**2  # 1MB
+IMAGES_PER_RELEASE = 0
+BASE_IMAGE = "busybox:latest"
+REPEATS = 3
+POLL_INTERVAL = 0.5
+EXPORT_TIMEOUT = 3600
+DIMENSIONS = ["release_count", "files_per_release", "file_size", "images_per_release"]
+
+
+@dataclass
+class ExportResult:
+    """Export times of the fixture at one step."""
+
+    scale: int
+    fixture: dict[str, int]
+    durations: list[float] = field(default_factory=list)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.durations)
+
+
+def get_scaled_fixture(
+    release_count: int, files_per_release: int, file_size: int, images: list[ImageSpec] | None = None
+) -> FixtureSpec:
+    """Build releases 1.0.0 to 1.0.`release_count - 1`, each with its own files and an equal share of `images`.
+
+    :param release_count: Number of releases.
+    :param files_per_release: Number of files in each release.
+    :param file_size: Size of each file in bytes.
+    :param images: Images in the model's repository to split between the releases, defaults to None.
+    :return: The fixture.
+    """
+    images = images or []
+    images_per_release = len(images) // release_count if release_count else 0
+    return FixtureSpec(
+        [
+            ReleaseSpec(
+                f"1.0.{release_index}",
+                tuple(
+                    FileSpec(f"blob-{release_index}-{file_index}-{file_size:_}.blob", file_size)
+                    for file_index in range(files_per_release)
+                ),
+                images=tuple(images[release_index * images_per_release : (release_index + 1) * images_per_release]),
+            )
+            for release_index in range(release_count)
+        ]
+    )
+
+
+def push_images(
+    boilerplate_client: BailoBoilerplateClient, model_id: str, image_count: int, base_image: str = BASE_IMAGE
+) -> list[ImageSpec]:
+    """Push `base_image` to the model's repository `image_count` times under different names.
+
+    :param boilerplate_client: Client of the Bailo instance to push to.
+    :param model_id: Model to push to.
+    :param image_count: Number of images to push.
+    :param base_image: Image to pull and push, defaults to BASE_IMAGE.
+    :return: The pushed images.
+    """
+    registry = boilerplate_client.client.url.removeprefix("http://").removeprefix("https://").removesuffix("/api")
+    images = []
+    for image_index in range(image_count):
+        image = ImageSpec(f"export-benchmark-{image_index}", "1.0.0")
+        image_name_full = f"{registry}/{model_id}/{image.name}:{image.tag}"
+        boilerplate_client.run_subprocess(["docker", "tag", base_image, image_name_full], check=True)
+        boilerplate_client.run_subprocess(["docker", "push", image_name_full], check=True)
+        boilerplate_client.run_subprocess(["docker", "rmi", image_name_full], check=True)
+        images.append(image)
+    return images
+
+
+def list_export_objects(
+    boilerplate_client: BailoBoilerplateClient, bucket: str, prefix: str = "", endpoint_url: str | None = None
+) -> dict[str, str]:
+    """List the objects in the export bucket with the AWS CLI.
+
+    :param boilerplate_client: Client to run the AWS CLI with.
+    :param bucket: Bucket Bailo exports to.
+    :param prefix: Only list keys starting with this, defaults to "".
+    :param endpoint_url: S3 endpoint, defaults to None in which case AWS is used.
+    :return: Mapping of key to the object's ETag and last modified time.
+    """
+    args = ["aws", "s3api", "list-objects-v2", "--bucket", bucket, "--prefix", prefix, "--output", "json"]
+    if endpoint_url:
+        args += ["--endpoint-url", endpoint_url]
+    completed = boilerplate_client.run_subprocess(args, check=True, capture_output=True, text=True)
+    contents = json.loads(completed.stdout or "{}").get("Contents") or []
+    return {item["Key"]: f"{item['ETag']} {item['LastModified']}" for item in contents}
+
+
+def export_model(
+    boilerplate_client: BailoBoilerplateClient,
+    model_id: str,
+    semvers: list[str],
+    bucket: str,
+    prefix: str = "",
+    endpoint_url: str | None = None,
+    poll_interval: float = POLL_INTERVAL,
+    timeout: float = EXPORT_TIMEOUT,
+) -> float:
+    """Export releases of a model to S3 for mirroring, and wait for the exported archive to appear in the bucket.
+
+    :param boilerplate_client: Client to export with.
+    :param model_id: Model to export, which must have a mirror destination set.
+    :param semvers: Releases to export.
+    :param bucket: Bucket Bailo exports to.
+    :param prefix: Only watch keys starting with this, defaults to "".
+    :param endpoint_url: S3 endpoint, defaults to None in which case AWS is used.
+    :param poll_interval: Seconds between listing the bucket, defaults to POLL_INTERVAL.
+    :param timeout: Seconds to wait for the archive, defaults to EXPORT_TIMEOUT.
+    :raises RuntimeError: If the export request is not successful.
+    :raises TimeoutError: If no archive appears within `timeout`.
+    :return: Duration from the export request until the archive appeared, in seconds.
+    """
+    existing = list_export_objects(boilerplate_client, bucket, prefix, endpoint_url)
+    start = time.perf_counter()
+    res = boilerplate_client.agent.post(
+        f"{boilerplate_client.client.url}/v2/model/{model_id}/export/s3",
+        json={"disclaimerAgreement": True, "semvers": semvers},
+        timeout=10_000,
+    )
+    if not 200 <= res.status_code < 300:
+        raise RuntimeError(f"Exporting {model_id} failed with status {res.status_code}")
+    while time.perf_counter() - start < timeout:
+        objects = list_export_objects(boilerplate_client, bucket, prefix, endpoint_url)
+        if any(existing.get(key) != version for key, version in objects.items()):
+            return time.perf_counter() - start
+        time.sleep(poll_interval)
+    raise TimeoutError(f"No exported archive of {model_id} appeared in {bucket}/{prefix} within {timeout}s")
+
+
+def fit_power_law(xs: list[float], ys: list[float]) -> tuple[float, float]:
+    """Least squares fit of `y = coefficient * x ** exponent` on a log-log scale.
+
+    :param xs: Positive x values, at least two of which are different.
+    :param ys: Positive y values.
+    :return: The exponent and coefficient.
+    """
+    slope, intercept = statistics.linear_regression([math.log(x) for x in xs], [math.log(y) for y in ys])
+    return slope, math.exp(intercept)
+
+
+def run(
+    boilerplate_client: BailoBoilerplateClient,
+    *,
+    scale_by: str = SCALE_BY,
+    scale_values: list[int] | None = None,
+    release_count: int = RELEASE_COUNT,
+    files_per_release: int = FILES_PER_RELEASE,
+    file_size: int = FILE_SIZE,
+    images_per_release: int = IMAGES_PER_RELEASE,
+    base_image: str = BASE_IMAGE,
+    repeats: int = REPEATS,
+    max_workers: int = MAX_WORKERS,
+    model_name_prefix: str = MODEL_NAME_PREFIX,
+    export_bucket: str | None = None,
+    export_prefix: str = "",
+    s3_endpoint_url: str | None = None,
+    destination_model_id: str | None = None,
+    poll_interval: float = POLL_INTERVAL,
+    export_timeout: float = EXPORT_TIMEOUT,
+) -> list[ExportResult]:
+    """Build and export a model for each of `scale_values`, then fit how the export time scales.
+
+    :param boilerplate_client: Client to build and export the models with.
+    :param scale_by: Dimension to scale, one of DIMENSIONS, defaults to SCALE_BY.
+    :param scale_values: Values of the scaled dimension, defaults to None in which case SCALE_VALUES is used.
+    :param release_count: Number of releases when not scaled, defaults to RELEASE_COUNT.
+    :param files_per_release: Number of files per release when not scaled, defaults to FILES_PER_RELEASE.
+    :param file_size: File size in bytes when not scaled, defaults to FILE_SIZE.
+    :param images_per_release: Number of images per release when not scaled, defaults to IMAGES_PER_RELEASE.
+    :param base_image: Image to push when using images, defaults to BASE_IMAGE.
+    :param repeats: Number of exports of each model, defaults to REPEATS.
+    :param max_workers: Number of concurrent uploads and releases when building the fixtures, defaults to MAX_WORKERS.
+    :param model_name_prefix: Prefix of each model name, defaults to MODEL_NAME_PREFIX.
+    :param export_bucket: Bucket Bailo exports to, defaults to None in which case `EXPORT_BUCKET` is used.
+    :param export_prefix: Only watch keys in the bucket starting with this, defaults to "".
+    :param s3_endpoint_url: S3 endpoint, defaults to None in which case `S3_ENDPOINT_URL` is used if set.
+    :param destination_model_id: Mirror destination to set on each model, defaults to None in which case the model's
+        own ID is used, as nothing is imported.
+    :param poll_interval: Seconds between listing the bucket, defaults to POLL_INTERVAL.
+    :param export_timeout: Seconds to wait for each export, defaults to EXPORT_TIMEOUT.
+    :raises ValueError: If `scale_by` is not one of DIMENSIONS, or no export bucket is set.
+    :return: Export times of each step.
+    """
+    if scale_by not in DIMENSIONS:
+        raise ValueError(f"scale_by must be one of {DIMENSIONS}")
+    if scale_values is None:
+        scale_values = SCALE_VALUES
+    export_bucket = export_bucket or boilerplate_client.getenv("EXPORT_BUCKET")
+    if not export_bucket:
+        raise ValueError("export_bucket or EXPORT_BUCKET must be set to wait for each export to finish")
+    s3_endpoint_url = s3_endpoint_url or boilerplate_client.getenv("S3_ENDPOINT_URL")
+    base = {
+        "release_count": release_count,
+        "files_per_release": files_per_release,
+        "file_size": file_size,
+        "images_per_release": images_per_release,
+    }
+    uses_images = images_per_release > 0 or scale_by == "images_per_release"
+    if uses_images:
+        boilerplate_client.run_subprocess(["docker", "pull", base_image], check=True)
+        registry = boilerplate_client.client.url.removeprefix("http://").removeprefix("https://").removesuffix("/api")
+        boilerplate_client.run_subprocess(
+            [
+                "docker",
+                "login",
+                registry,
+                "-u",
+                boilerplate_client.getenv("ACCESS_KEY"),
+                "-p",
+                boilerplate_client.getenv("SECRET_KEY"),
+            ],
+            check=True,
+        )
+
+    scope = uuid.uuid4().hex[:8]
+    results = []
+    for scale in scale_values:
+        fixture = {**base, scale_by: scale}
+        model = Model.create(
+            boilerplate_client.client,
+            f"{model_name_prefix}-{scope}-{scale_by}-{scale}",
+            f"A simple model for benchmarking exports with {fixture}",
+        )
+        model.card_from_schema()
+        boilerplate_client.client.patch_model(
+            model.model_id, settings={"mirror": {"destinationModelId": destination_model_id or model.model_id}}
+        )
+        print(f"Building {model.model_id} with {fixture}")
+        images = []
+        if fixture["images_per_release"]:
+            images = push_images(
+                boilerplate_client,
+                model.model_id,
+                fixture["release_count"] * fixture["images_per_release"],
+                base_image,
+            )
+        spec = get_scaled_fixture(fixture["release_count"], fixture["files_per_release"], fixture["file_size"], images)
+        reconcile(boilerplate_client, model, spec, max_workers)
+
+        result = ExportResult(scale, fixture)
+        semvers = [release.version for release in spec.releases]
+        for _ in range(repeats):
+            result.durations.append(
+                export_model(
+                    boilerplate_client,
+                    model.model_id,
+                    semvers,
+                    export_bucket,
+                    export_prefix,
+                    s3_endpoint_url,
+                    poll_interval,
+                    export_timeout,
+                )
+            )
+        print(f"Exported {scale_by}={scale} in {', '.join(f'{duration:.2f}s' for duration in result.durations)}")
+        results.append(result)
+
+    print(f"{scale_by:>18} {'median s':>9} {'min s':>7} {'max s':>7}")
+    for result in results:
+        print(f"{result.scale:>18} {result.median:>9.2f} {min(result.durations):>7.2f} {max(result.durations):>7.2f}")
+    if len({result.scale for result in results}) > 1:
+        exponent, coefficient = fit_power_law(
+            [result.scale for result in results], [result.median for result in results]
+        )
+        growth = "sublinear" if exponent < 0.9 else "roughly linear" if exponent <= 1.1 else "superlinear"
+        print(f"Export time ~ {coefficient:.3g}s * {scale_by}^{exponent:.2f} ({growth})")
+    return results
+
+
+if __name__ == "__main__":
+    run(BailoBoilerplateClient())
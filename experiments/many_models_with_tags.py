@@ -3,29 +3,76 @@ Used for testing case sensitive searches."""
 
 from __future__ import annotations
 
-from random import getrandbits, randint, sample
+import random
+from typing import Any
 
 from bailo import Model
 from boilerplate_client import BailoBoilerplateClient
 
-boilerplate_client = BailoBoilerplateClient(dotenv_file=".local.env")
-client = boilerplate_client.client
-
 MODEL_NAME_PREFIX = "Many-Models-With-Tags"
 MODEL_COUNT = 1000
 MODEL_DESCRIPTION = "A simple model for testing case sensitivity of tag searches"
 POSSIBLE_TAGS = ["foo-bar", "hello-world", "foo-bar-baz-bat"]
 
-for i in range(MODEL_COUNT):
-    model_name = f"{MODEL_NAME_PREFIX}{i}"
-    print(f"{model_name=}")
-    test_model = Model.create(client, model_name, MODEL_DESCRIPTION)
+
+def random_tags(possible_tags: list[str], rng: random.Random | None = None) -> list[str]:
+    """Randomly sample some of `possible_tags`, upper casing each sampled tag half of the time.
+
+    :param possible_tags: Tags to sample from.
+    :param rng: Random number generator, defaults to None in which case an unseeded one is used.
+    :return: The sampled tags.
+    """
+    rng = rng or random.Random()
+    return [
+        tag if bool(rng.getrandbits(1)) else tag.upper()
+        for tag in rng.sample(possible_tags, k=rng.randint(0, len(possible_tags)))
+    ]
+
+
+def create_tagged_model(
+    boilerplate_client: BailoBoilerplateClient, model_name: str, model_description: str, tags: list[str]
+) -> dict[str, Any]:
+    """Create a model with a minimal model card containing `tags`. Can be used as a `WorkerPool` task.
+
+    :param boilerplate_client: Client to create the model with.
+    :param model_name: Model name.
+    :param model_description: Model description.
+    :param tags: Model card tags.
+    :return: The updated model card.
+    """
+    test_model = Model.create(boilerplate_client.client, model_name, model_description)
     test_model.card_from_schema()
-    test_model.get_card_latest()
-    print(f"{test_model.model_card=}")
     new_card = test_model.model_card.copy() if test_model.model_card else {"overview": {"tags": []}}
-    new_card["overview"]["tags"] = [
-        tag if bool(getrandbits(1)) else tag.upper() for tag in sample(POSSIBLE_TAGS, k=randint(0, len(POSSIBLE_TAGS)))
-    ]
-    print(f"{new_card=}")
+    new_card["overview"]["tags"] = tags
     test_model.update_model_card(model_card=new_card)
+    return test_model.model_card
+
+
+def run(
+    boilerplate_client: BailoBoilerplateClient,
+    *,
+    model_count: int = MODEL_COUNT,
+    model_name_prefix: str = MODEL_NAME_PREFIX,
+    model_description: str = MODEL_DESCRIPTION,
+    possible_tags: list[str] | None = None,
+) -> None:
+    """Create `model_count` models, each with a random sample of `possible_tags` in random case.
+
+    :param boilerplate_client: Client to create the models with.
+    :param model_count: Number of models to create, defaults to MODEL_COUNT.
+    :param model_name_prefix: Prefix of each model name, defaults to MODEL_NAME_PREFIX.
+    :param model_description: Description of each model, defaults to MODEL_DESCRIPTION.
+    :param possible_tags: Tags to sample from, defaults to None in which case POSSIBLE_TAGS is used.
+    """
+    if possible_tags is None:
+        possible_tags = POSSIBLE_TAGS
+
+    for i in range(model_count):
+        model_name = f"{model_name_prefix}{i}"
+        print(f"{model_name=}")
+        new_card = create_tagged_model(boilerplate_client, model_name, model_description, random_tags(possible_tags))
+        print(f"{new_card=}")
+
+
+if __name__ == "__main__":
+    run(BailoBoilerplateClient(dotenv_file=".local.env"))
@@ -9,11 +9,15 @@ from boilerplate_client import BailoBoilerplateClient
 MODEL_ID_ENV_VAR = "MANY_RELEASES_WITH_EXISTING_IMAGES_MODEL_ID"
 
 
-if __name__ == "__main__":
-    boilerplate_client = BailoBoilerplateClient()
+def run(boilerplate_client: BailoBoilerplateClient, *, model_id_env_var: str = MODEL_ID_ENV_VAR) -> None:
+    """Group a model's existing images into triangular numbered groups and create a release for each group.
+
+    :param boilerplate_client: Client to create the releases with.
+    :param model_id_env_var: Env var holding the model ID, defaults to MODEL_ID_ENV_VAR.
+    """
     client = boilerplate_client.client
     experiment_model = boilerplate_client.get_or_create_model(
-        MODEL_ID_ENV_VAR,
+        model_id_env_var,
         "many-releases-with-existing-images-test",
         "A simple model for testing many releases with user created images.",
     )
@@ -48,3 +52,7 @@ if __name__ == "__main__":
             notes,
             images=image_group,
         )
+
+
+if __name__ == "__main__":
+    run(BailoBoilerplateClient())
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import datetime
 
-from boilerplate_client import BailoBoilerplateClient, LazyStream
+from boilerplate_client import BailoBoilerplateClient
+from release_fixtures import MAX_WORKERS, FileSpec, FixtureSpec, ReleaseSpec, reconcile
 
 MODEL_ID_ENV_VAR = "MANY_RELEASES_WITH_FILES_MODEL_ID"
 
@@ -10,39 +11,49 @@ FILE_COUNT = 100
 MAX_FILE_SIZE_EXPONENT = 10
 
 
-if __name__ == "__main__":
-    boilerplate_client = BailoBoilerplateClient()
-    client = boilerplate_client.client
+def get_fixture(file_count: int = FILE_COUNT, max_file_size_exponent: int = MAX_FILE_SIZE_EXPONENT) -> FixtureSpec:
+    """Build releases 0.0.0 to 0.0.`file_count`, where release 0.0.n contains the n smallest files.
+
+    :param file_count: Number of files, defaults to FILE_COUNT.
+    :param max_file_size_exponent: Largest file is roughly 10 to the power of this, defaults to MAX_FILE_SIZE_EXPONENT.
+    :return: The fixture.
+    """
+    files = []
+    for file_index in range(file_count):
+        # exponential increase, with each file size guaranteed to be unique
+        file_size = int(10 ** (max_file_size_exponent * (file_index) / file_count) + file_index)
+        files.append(FileSpec(f"blob-{file_size:_}.blob", file_size))
+    notes = f"Uploaded using the Bailo Python client at {datetime.datetime.now():%Y-%m-%d %H:%M:%S%z}"
+    return FixtureSpec(
+        [
+            ReleaseSpec(f"0.0.{release_index}", tuple(files[:release_index]), notes)
+            for release_index in range(file_count + 1)
+        ]
+    )
+
+
+def run(
+    boilerplate_client: BailoBoilerplateClient,
+    *,
+    model_id_env_var: str = MODEL_ID_ENV_VAR,
+    file_count: int = FILE_COUNT,
+    max_file_size_exponent: int = MAX_FILE_SIZE_EXPONENT,
+    max_workers: int = MAX_WORKERS,
+) -> None:
+    """Upload `file_count` exponentially larger files, then create a release for each prefix of the files sorted by
+    size. Only the files and releases missing from the model are created, so re-running is cheap.
+
+    :param boilerplate_client: Client to create the artefacts with.
+    :param model_id_env_var: Env var holding the model ID, defaults to MODEL_ID_ENV_VAR.
+    :param file_count: Number of files to upload, defaults to FILE_COUNT.
+    :param max_file_size_exponent: Largest file is roughly 10 to the power of this, defaults to MAX_FILE_SIZE_EXPONENT.
+    :param max_workers: Number of concurrent uploads and releases, defaults to MAX_WORKERS.
+    """
     experiment_model = boilerplate_client.get_or_create_model(
-        MODEL_ID_ENV_VAR, "many-releases-with-files-test", "A simple model for testing many releases with files."
+        model_id_env_var, "many-releases-with-files-test", "A simple model for testing many releases with files."
     )
-    model_id = experiment_model.model_id
+    reconcile(boilerplate_client, experiment_model, get_fixture(file_count, max_file_size_exponent), max_workers)
 
-    existing_file_sizes = [f["size"] for f in client.get_files(model_id)["files"]]
-    for file_index in range(FILE_COUNT):
-        # exponential increase, with each file size guaranteed to be unique
-        file_size = int(10 ** (MAX_FILE_SIZE_EXPONENT * (file_index) / FILE_COUNT) + file_index)
-        if file_size not in existing_file_sizes:
-            print(f"Uploading file {file_index} size {file_size:_}")
-            res = client.simple_upload(
-                model_id,
-                f"blob-{file_size:_}.blob",
-                LazyStream(total_size=file_size),
-            )
-        else:
-            print(f"Skip existing file {file_index} size {file_size:_}")
-
-    all_files_by_size = [
-        file["id"] for file in sorted(client.get_files(model_id)["files"], key=lambda file: file["size"])
-    ]
-    for release_index in range(len(all_files_by_size) + 1):
-        new_release_version = boilerplate_client.get_next_model_version(experiment_model, "next_patch")
-
-        notes = f"Uploaded using the Bailo Python client at {datetime.datetime.now():%Y-%m-%d %H:%M:%S%z}"
-        files = all_files_by_size[:release_index]
-        print(f"Creating new release {new_release_version} with {len(files)} files")
-        experiment_model.create_release(
-            new_release_version,
-            notes,
-            files=files,
-        )
+
+if __name__ == "__main__":
+    run(BailoBoilerplateClient())
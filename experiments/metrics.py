@@ -0,0 +1,189 @@
+"""Live metrics shared between the workers of a `WorkerPool` and a single reporter in the main process.
+
+Counters and gauges live in one shared memory array, so workers in other processes can update them with a single
+locked write rather than sending messages or printing. `MetricsReporter` renders a live progress line from them and,
+if given a snapshot file, appends a JSON snapshot to it every interval. Experiments pass the client's `METRICS_FILE`,
+so that it can be set in the dotenv file:
+
+```python
+from itertools import repeat
+
+from metrics import Metrics, MetricsReporter
+from worker_pool import WorkerPool, upload_task
+
+metrics = Metrics()
+snapshot_file = boilerplate_client.getenv("METRICS_FILE")
+with (
+    MetricsReporter(metrics, total=64, snapshot_file=snapshot_file),
+    WorkerPool(8, metrics=metrics, use_processes=True) as pool,
+):
+    list(pool.map(upload_task, repeat(model_id), names, sizes))
+```
+
+`WorkerPool` counts started, finished and failed tasks and the tasks in flight, and `upload_task` counts bytes sent.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from typing import Any
+
+COUNTERS = ["started", "finished", "errors", "bytes"]
+GAUGES = ["in_flight"]
+
+
+class Metrics:
+    """Named counters and gauges in shared memory. Pass to worker processes on creation, e.g. via pool `initargs`."""
+
+    def __init__(self, extra_counters: list[str] | None = None, extra_gauges: list[str] | None = None):
+        """
+        :param extra_counters: Names of values that only increase, in addition to COUNTERS, defaults to None.
+        :param extra_gauges: Names of values that go up and down, in addition to GAUGES, defaults to None.
+        """
+        self.counters = COUNTERS + (extra_counters or [])
+        self.gauges = GAUGES + (extra_gauges or [])
+        self._indexes = {name: i for i, name in enumerate(self.counters + self.gauges)}
+        self._values = multiprocessing.Array("d", len(self._indexes))
+
+    def add(self, name: str, value: float = 1) -> None:
+        """Increment a counter or gauge, or decrement a gauge with a negative value."""
+        with self._values.get_lock():
+            self._values[self._indexes[name]] += value
+
+    def set(self, name: str, value: float) -> None:
+        """Set a gauge."""
+        self._values[self._indexes[name]] = value
+
+    def snapshot(self) -> dict[str, float]:
+        """Get a consistent copy of every value.
+
+        :return: Mapping of name to value.
+        """
+        with self._values.get_lock():
+            values = self._values[:]
+        return dict(zip(self._indexes, values))
+
+
+class MeteredStream:
+    """File-like wrapper counting the bytes read from a stream (such as a `LazyStream`) into a counter."""
+
+    def __init__(self, stream: Any, metrics: Metrics, counter: str = "bytes"):
+        """
+        :param stream: Stream to wrap.
+        :param metrics: Metrics to count into.
+        :param counter: Counter to add the bytes read to, defaults to "bytes".
+        """
+        self.stream = stream
+        self.metrics = metrics
+        self.counter = counter
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.metrics.add(self.counter, len(data))
+        return data
+
+    def tell(self) -> int:
+        return self.stream.tell()
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self.stream.seek(offset, whence)
+
+    @property
+    def total_size(self) -> int:
+        """Total size of the wrapped stream, so the request body can be measured without reading it."""
+        return self.stream.total_size
+
+    def __len__(self) -> int:
+        if hasattr(self.stream, "__len__"):
+            return len(self.stream)
+        if hasattr(self.stream, "total_size"):
+            return self.stream.total_size
+        position = self.stream.tell()
+        size = self.stream.seek(0, os.SEEK_END)
+        self.stream.seek(position)
+        return size
+
+
+class MetricsReporter:
+    """Background thread rendering a progress line from `Metrics`, and optionally writing snapshots as JSON lines."""
+
+    def __init__(
+        self, metrics: Metrics, total: int | None = None, interval: float = 1.0, snapshot_file: str | None = None
+    ):
+        """
+        :param metrics: Metrics to report. Extra counters and gauges are only written to the snapshot file.
+        :param total: Number of tasks expected, defaults to None.
+        :param interval: Seconds between updates, defaults to 1.0.
+        :param snapshot_file: JSON lines file to append snapshots to, defaults to None in which case no snapshots are
+            written.
+        """
+        self.metrics = metrics
+        self.total = total
+        self.interval = interval
+        self.snapshot_file = snapshot_file
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-reporter", daemon=True)
+        self._start_time = 0.0
+        self._last: tuple[float, float] = (0.0, 0.0)
+
+    def format_line(self, values: dict[str, float], now: float) -> str:
+        """Render the progress line.
+
+        :param values: Snapshot of the metrics.
+        :param now: Time of the snapshot from `time.perf_counter`.
+        :return: The progress line.
+        """
+        last_time, last_bytes = self._last
+        rate = (values["bytes"] - last_bytes) / (now - last_time) if now > last_time else 0.0
+        average = values["bytes"] / (now - self._start_time) if now > self._start_time else 0.0
+        done = int(values["finished"] + values["errors"])
+        error_rate = values["errors"] / done if done else 0.0
+        total = f"/{self.total}" if self.total is not None else ""
+        return (
+            f"{done}{total} done, {int(values['in_flight'])} in flight, "
+            f"{int(values['errors'])} errors ({error_rate:.1%}), "
+            f"{rate / 1024**2:.1f} MB/s (average {average / 1024**2:.1f} MB/s), {now - self._start_time:.0f}s"
+        )
+
+    def report(self) -> None:
+        """Render the progress line and write a snapshot now."""
+        now = time.perf_counter()
+        values = self.metrics.snapshot()
+        line = self.format_line(values, now)
+        if sys.stdout.isatty():
+            print(f"\r\033[K{line}", end="", flush=True)
+        else:
+            print(line, flush=True)
+        if self.snapshot_file:
+            with open(self.snapshot_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"time": time.time(), "elapsed": now - self._start_time, **values}) + "\n")
+        self._last = (now, values["bytes"])
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.report()
+
+    def start(self) -> None:
+        self._start_time = time.perf_counter()
+        self._last = (self._start_time, 0.0)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread, then report the final values."""
+        self._stop.set()
+        self._thread.join()
+        self.report()
+        if sys.stdout.isatty():
+            print()
+
+    def __enter__(self) -> MetricsReporter:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
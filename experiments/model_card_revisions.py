@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import json
-import os
 from time import sleep
 from typing import Any
 
@@ -47,17 +46,36 @@ def revise_model_card(model: Model):
         print(f"{e}\n{json.dumps(new_card)}")
 
 
-if __name__ == "__main__":
-    boilerplate_client = BailoBoilerplateClient(".dev.env")
+MODEL_ID_ENV_VAR = "MODEL_CARD_REVISION_MODEL_ID"
+REVISION_COUNT = 40
+
+
+def run(
+    boilerplate_client: BailoBoilerplateClient,
+    *,
+    model_id_env_var: str = MODEL_ID_ENV_VAR,
+    revision_count: int = REVISION_COUNT,
+    delay: float = 1,
+) -> None:
+    """Create `revision_count` random revisions of an existing model's card.
+
+    :param boilerplate_client: Client to revise the model card with.
+    :param model_id_env_var: Env var holding the model ID, defaults to MODEL_ID_ENV_VAR.
+    :param revision_count: Number of revisions to make, defaults to REVISION_COUNT.
+    :param delay: Seconds to wait between revisions, defaults to 1.
+    """
     client = boilerplate_client.client
 
-    MODEL_ID_ENV_VAR = "MODEL_CARD_REVISION_MODEL_ID"
-    MODEL_ID = os.getenv(MODEL_ID_ENV_VAR)
-    if not MODEL_ID:
-        raise Exception("Env var MODEL_CARD_REVISION_MODEL_ID not set")
+    model_id = boilerplate_client.getenv(model_id_env_var)
+    if not model_id:
+        raise Exception(f"Env var {model_id_env_var} not set")
 
-    model = Model.from_id(client, MODEL_ID)
-    for i in range(40):
+    model = Model.from_id(client, model_id)
+    for i in range(revision_count):
         print(i)
         revise_model_card(model)
-        sleep(1)
+        sleep(delay)
+
+
+if __name__ == "__main__":
+    run(BailoBoilerplateClient(".dev.env"))
@@ -0,0 +1,169 @@
+"""Benchmark model search latency as the number of models grows.
+Models are seeded in stages (by default up to 1k, 10k then 100k models) with tags sampled and case mutated in the same
+way as `many_models_with_tags.py`. After each stage a fixed set of name and tag searches is run repeatedly, reporting
+p50/p99 latency and whether each search found the expected number of seeded models.
+Every model name is scoped with a run ID so results are not affected by other models on the server, and if
+`LEDGER_FILE` is set the seeded models can be deleted afterwards with `teardown.py`."""
+
+from __future__ import annotations
+
+import random
+import statistics
+import time
+import uuid
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Any
+
+from boilerplate_client import BailoBoilerplateClient
+from many_models_with_tags import POSSIBLE_TAGS, create_tagged_model, random_tags
+from stats import percentile
+from worker_pool import WorkerPool
+
+MODEL_NAME_PREFIX = "Model-Search-Benchmark"
+MODEL_DESCRIPTION = "A simple model for benchmarking model searches"
+STAGES = [1_000, 10_000, 100_000]
+QUERY_REPEATS = 20
+MAX_WORKERS = 16
+
+
+@dataclass
+class SearchQuery:
+    """A search to time, and which seeded models it is expected to find."""
+
+    name: str
+    params: dict[str, Any]
+    tag: str | None = None
+
+    def matches(self, tags: list[str]) -> bool:
+        """Search is a partial case-insensitive match, so tag searches should find any tag containing the tag in any
+        case.
+
+        :param tags: Tags of a seeded model.
+        :return: Whether the model should be found.
+        """
+        return self.tag is None or any(self.tag.lower() in tag.lower() for tag in tags)
+
+
+@dataclass
+class QueryResult:
+    """Latencies and result counts of a search at one stage."""
+
+    model_count: int
+    query: str
+    expected: int
+    actual: int
+    latencies: list[float] = field(default_factory=list)
+
+    @property
+    def correct(self) -> bool:
+        return self.expected == self.actual
+
+
+def get_queries(scope: str, possible_tags: list[str]) -> list[SearchQuery]:
+    """Build the fixed set of searches run after each stage.
+
+    :param scope: Name prefix of every model seeded by this run.
+    :param possible_tags: Tags the models were seeded with.
+    :return: The searches.
+    """
+    queries = [
+        SearchQuery("name", {"search": scope, "title_only": True}),
+        SearchQuery("name, mine", {"search": scope, "title_only": True, "filters": ["mine"]}),
+    ]
+    for tag in possible_tags:
+        queries.append(SearchQuery(f"tag {tag}", {"search": tag}, tag))
+        queries.append(SearchQuery(f"tag {tag.upper()}", {"search": tag.upper()}, tag))
+    return queries
+
+
+def time_query(
+    boilerplate_client: BailoBoilerplateClient, query: SearchQuery, scope: str, repeats: int
+) -> tuple[list[float], int]:
+    """Run a search `repeats` times after one untimed warm up.
+
+    :param boilerplate_client: Client to search with.
+    :param query: Search to run.
+    :param scope: Name prefix of the seeded models, to ignore any other models found.
+    :param repeats: Number of timed searches.
+    :return: Latency of each search in seconds, and the number of seeded models found by the last search.
+    """
+    client = boilerplate_client.client
+    client.get_models(**query.params)
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        res = client.get_models(**query.params)
+        latencies.append(time.perf_counter() - start)
+    found = sum(1 for model in res["models"] if model["name"].startswith(f"{scope}-"))
+    return latencies, found
+
+
+def run(
+    boilerplate_client: BailoBoilerplateClient,
+    *,
+    stages: list[int] | None = None,
+    query_repeats: int = QUERY_REPEATS,
+    max_workers: int = MAX_WORKERS,
+    seed_rate_limit: float | None = None,
+    model_name_prefix: str = MODEL_NAME_PREFIX,
+    model_description: str = MODEL_DESCRIPTION,
+    possible_tags: list[str] | None = None,
+    seed: int | None = None,
+) -> list[QueryResult]:
+    """Seed models up to each stage's total and time the searches after each stage.
+
+    :param boilerplate_client: Client to search with. Each seeding worker builds its own client from the same dotenv
+        file.
+    :param stages: Total number of models after each stage, defaults to None in which case STAGES is used.
+    :param query_repeats: Number of times to time each search, defaults to QUERY_REPEATS.
+    :param max_workers: Number of models to create at once, defaults to MAX_WORKERS.
+    :param seed_rate_limit: Maximum models to start creating per second, defaults to None (unlimited).
+    :param model_name_prefix: Prefix of each model name, defaults to MODEL_NAME_PREFIX.
+    :param model_description: Description of each model, defaults to MODEL_DESCRIPTION.
+    :param possible_tags: Tags to sample from, defaults to None in which case POSSIBLE_TAGS is used.
+    :param seed: Seed for the sampled tags, defaults to None.
+    :return: Result of each search at each stage.
+    """
+    if stages is None:
+        stages = STAGES
+    if possible_tags is None:
+        possible_tags = POSSIBLE_TAGS
+    rng = random.Random(seed)
+    scope = f"{model_name_prefix}-{uuid.uuid4().hex[:8]}"
+    queries = get_queries(scope, possible_tags)
+    print(f"Seeding models named {scope}-*")
+
+    seeded_tags: list[list[str]] = []
+    results = []
+    with WorkerPool(max_workers, boilerplate_client.dotenv_file, rate_limit=seed_rate_limit) as pool:
+        for stage in sorted(stages):
+            new_tags = [random_tags(possible_tags, rng) for _ in range(len(seeded_tags), stage)]
+            names = [f"{scope}-{i}" for i in range(len(seeded_tags), stage)]
+            start = time.perf_counter()
+            for i, _ in enumerate(pool.map(create_tagged_model, names, repeat(model_description), new_tags), 1):
+                if i % 1000 == 0:
+                    print(f"Seeded {i}/{len(names)} models")
+            seeded_tags.extend(new_tags)
+            seed_time = time.perf_counter() - start
+            print(f"Seeded {len(names)} models in {seed_time:.1f}s ({len(names) / seed_time:.1f} models/s)")
+
+            print(f"{'query':<28} {'p50 ms':>8} {'p99 ms':>8} {'expected':>9} {'actual':>9}")
+            for query in queries:
+                latencies, found = time_query(boilerplate_client, query, scope, query_repeats)
+                expected = sum(1 for tags in seeded_tags if query.matches(tags))
+                result = QueryResult(stage, query.name, expected, found, latencies)
+                print(
+                    f"{query.name:<28} {statistics.median(latencies) * 1000:>8.1f} "
+                    f"{percentile(latencies, 0.99) * 1000:>8.1f} {expected:>9} {found:>9}"
+                    f"{'' if result.correct else '  MISMATCH'}"
+                )
+                results.append(result)
+
+    mismatches = [result for result in results if not result.correct]
+    print(f"{len(results) - len(mismatches)}/{len(results)} searches found the expected number of models")
+    return results
+
+
+if __name__ == "__main__":
+    run(BailoBoilerplateClient())
@@ -2,18 +2,20 @@
 
 from __future__ import annotations
 
-import os
-
 from bailo import Model
 from boilerplate_client import BailoBoilerplateClient
 
 MODEL_ID_ENV_VAR = "PURGE_ORPHANED_FILES_MODEL_ID"
 
 
-if __name__ == "__main__":
-    boilerplate_client = BailoBoilerplateClient()
+def run(boilerplate_client: BailoBoilerplateClient, *, model_id_env_var: str = MODEL_ID_ENV_VAR) -> None:
+    """Delete every file of the model that is not in any release.
+
+    :param boilerplate_client: Client to delete the files with.
+    :param model_id_env_var: Env var holding the model ID, defaults to MODEL_ID_ENV_VAR.
+    """
     client = boilerplate_client.client
-    model_id = os.getenv(MODEL_ID_ENV_VAR)
+    model_id = boilerplate_client.getenv(model_id_env_var)
     experiment_model = Model.from_id(client, model_id)
     all_files = client.get_files(model_id)
     all_releases = client.get_all_releases(model_id)
@@ -26,3 +28,7 @@ if __name__ == "__main__":
     for file_id in all_file_ids - all_release_files:
         print(f"Deleting orphaned file {file_id}")
         client.delete_file(model_id, file_id)
+
+
+if __name__ == "__main__":
+    run(BailoBoilerplateClient())
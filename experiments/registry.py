@@ -0,0 +1,122 @@
+"""Registry of experiments runnable through `runner.py`.
+
+Experiments are registered by module name only, so listing them never imports `bailo` or any other heavy dependency.
+Each experiment module exposes an entry point (by default `run`) taking the shared `BailoBoilerplateClient` as its
+first argument, followed by keyword-only options which can be set in the runner's TOML config.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class Experiment:
+    """A registered experiment."""
+
+    __slots__ = ("name", "module", "description", "entry_point")
+
+    def __init__(self, name: str, module: str, description: str, entry_point: str = "run"):
+        """
+        :param name: Name used to select the experiment from the runner.
+        :param module: Importable module containing the experiment.
+        :param description: One line description shown by `--list`.
+        :param entry_point: Name of the entry point within the module, defaults to "run".
+        """
+        self.name = name
+        self.module = module
+        self.description = description
+        self.entry_point = entry_point
+
+    def load(self) -> Callable[..., Any]:
+        """Import the experiment's module and return its entry point.
+
+        :return: The entry point callable.
+        """
+        return getattr(importlib.import_module(self.module), self.entry_point)
+
+
+EXPERIMENTS: dict[str, Experiment] = {}
+
+
+def register(name: str, module: str, description: str, entry_point: str = "run") -> Experiment:
+    """Register an experiment without importing it.
+
+    :param name: Name used to select the experiment from the runner.
+    :param module: Importable module containing the experiment.
+    :param description: One line description shown by `--list`.
+    :param entry_point: Name of the entry point within the module, defaults to "run".
+    :raises ValueError: If an experiment with the same name is already registered.
+    :return: The registered experiment.
+    """
+    if name in EXPERIMENTS:
+        raise ValueError(f"Experiment {name} is already registered")
+    experiment = Experiment(name, module, description, entry_point)
+    EXPERIMENTS[name] = experiment
+    return experiment
+
+
+def register_plugin(name: str, target: str) -> Experiment:
+    """Register an experiment from a `module:function` string, e.g. from the runner's `[plugins]` config table.
+
+    :param name: Name used to select the experiment from the runner.
+    :param target: `module:function` of the entry point.
+    :return: The registered experiment.
+    """
+    module, _, entry_point = target.partition(":")
+    return register(name, module, f"Plugin {target}", entry_point or "run")
+
+
+register(
+    "many-models-with-tags",
+    "many_models_with_tags",
+    "Create lots of models with predefined tags, randomly mutating the case of some of the tags.",
+)
+register(
+    "model-search-benchmark",
+    "model_search_benchmark",
+    "Seed tagged models in stages and report search latency and result counts after each stage.",
+)
+register("scanners", "scanners", "Upload various local files to a model to test the performance of the AV scanners.")
+register("long-names", "long_names", "Create a model, release, file and data card with very long names.")
+register("concurrent-file-uploads", "concurrent_file_uploads", "Upload multiple files simultaneously.")
+register(
+    "concurrent-file-downloads",
+    "concurrent_file_downloads",
+    "Download every file in a model's releases simultaneously, reporting throughput and latency.",
+)
+register(
+    "upload-benchmark",
+    "upload_benchmark",
+    "Sweep upload chunk size, file size, concurrency and rate limit, reporting throughput, latency and best settings.",
+)
+register("model-card-revisions", "model_card_revisions", "Set random values for each part of a model card.")
+register(
+    "many-releases-with-files",
+    "many_releases_with_files",
+    "Create releases with files where the file sizes exponentially increase.",
+)
+register(
+    "several-releases-with-files",
+    "several_releases_with_files",
+    "Create releases with files where the total file size per release sums up to a known figure.",
+)
+register(
+    "many-releases-with-existing-images",
+    "many_releases_with_existing_images",
+    "Create releases from existing images with an increasing number of images per release.",
+)
+register(
+    "purge-files-without-release",
+    "purge_files_without_release",
+    "Delete any files attached to a model that are not in any releases.",
+)
+register(
+    "export-benchmark",
+    "export_benchmark",
+    "Build release fixtures of growing size, time exporting each for mirroring and fit how export time scales.",
+)
+register("clone-releases", "clone_releases", "Clone the skeleton releases of one model to another.")
@@ -0,0 +1,200 @@
+"""Declarative fixtures of files and releases, and an idempotent engine to reconcile a model with them.
+
+A fixture lists each release by version with the files (by name and size) it should contain. `reconcile` takes one
+snapshot of the model's files and releases, indexes it by file name and size and by release version, and then only
+uploads the missing files and creates (or fixes the files of) the missing releases, concurrently through a
+`WorkerPool`. Re-running a fixture against a model which already matches it only costs the two snapshot requests.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from concurrent.futures import as_completed
+from dataclasses import dataclass, field
+from itertools import repeat
+
+from bailo import Model
+from boilerplate_client import BailoBoilerplateClient
+from semantic_version import Version
+from worker_pool import WorkerPool, release_task, upload_task
+
+MAX_WORKERS = 8
+
+
+@dataclass(frozen=True)
+class FileSpec:
+    """A file identified by its name and size. Files are uploaded as `LazyStream` blobs of `size` bytes."""
+
+    name: str
+    size: int
+
+
+@dataclass(frozen=True)
+class ImageSpec:
+    """An image already pushed to the model's repository, identified by its name and tag."""
+
+    name: str
+    tag: str
+
+
+@dataclass(frozen=True)
+class ReleaseSpec:
+    """A release identified by its version, containing exactly `files`. `images` are only used when creating it."""
+
+    version: str
+    files: tuple[FileSpec, ...] = ()
+    notes: str = "Created by a release fixture"
+    minor: bool = False
+    draft: bool = False
+    images: tuple[ImageSpec, ...] = ()
+
+
+@dataclass
+class FixtureSpec:
+    """Releases to create, and any extra files to upload that are not in a release."""
+
+    releases: list[ReleaseSpec] = field(default_factory=list)
+    extra_files: list[FileSpec] = field(default_factory=list)
+
+    @property
+    def files(self) -> list[FileSpec]:
+        """Every file in the fixture, without duplicates and in order of first use."""
+        files = dict.fromkeys(self.extra_files)
+        for release in self.releases:
+            files.update(dict.fromkeys(release.files))
+        return list(files)
+
+
+@dataclass
+class ReconcileResult:
+    """Operations carried out by `reconcile`."""
+
+    uploaded_files: int = 0
+    existing_files: int = 0
+    created_releases: int = 0
+    updated_releases: int = 0
+    existing_releases: int = 0
+
+
+def version_key(version: str | Version) -> str:
+    """Normalise a version so that e.g. `1.0.0` and `v1.0.0` index the same release."""
+    return str(Version(str(version).lstrip("v")))
+
+
+def index_files(files: Iterable[dict]) -> dict[FileSpec, str]:
+    """Index files from `client.get_files` by name and size. Where there are duplicates the first file is used.
+
+    :param files: File objects.
+    :return: Mapping of file spec to file ID.
+    """
+    index: dict[FileSpec, str] = {}
+    for file in files:
+        index.setdefault(FileSpec(file["name"], file["size"]), file.get("id", file.get("_id")))
+    return index
+
+
+def update_release_files_task(
+    boilerplate_client: BailoBoilerplateClient,
+    model_id: str,
+    model_card_version: int,
+    release: dict,
+    file_ids: list[str],
+) -> str:
+    """Replace the files of an existing release, keeping its notes, images and draft state.
+
+    :param boilerplate_client: Worker's client.
+    :param model_id: Model the release belongs to.
+    :param model_card_version: Model card version of the release.
+    :param release: Release object from `client.get_all_releases`.
+    :param file_ids: File IDs the release should contain.
+    :return: The updated release version.
+    """
+    boilerplate_client.client.put_release(
+        model_id,
+        model_card_version,
+        release["semver"],
+        release["notes"],
+        release.get("draft", False),
+        file_ids,
+        release.get("images", []),
+    )
+    return release["semver"]
+
+
+def reconcile(
+    boilerplate_client: BailoBoilerplateClient, model: Model, spec: FixtureSpec, max_workers: int = MAX_WORKERS
+) -> ReconcileResult:
+    """Upload the fixture's missing files, then create its missing releases and fix the files of any existing ones.
+    Images are not pushed, so must already be in the model's repository.
+
+    :param boilerplate_client: Client to take the snapshot with. Each worker builds its own client from the same dotenv
+        file.
+    :param model: Model to reconcile.
+    :param spec: Fixture the model should match.
+    :param max_workers: Number of concurrent operations, defaults to MAX_WORKERS.
+    :return: Counts of the operations carried out.
+    """
+    client = boilerplate_client.client
+    model_id = model.model_id
+    file_ids = index_files(client.get_files(model_id)["files"])
+    releases = {version_key(release["semver"]): release for release in client.get_all_releases(model_id)["releases"]}
+    result = ReconcileResult()
+
+    missing_files = [file for file in spec.files if file not in file_ids]
+    result.existing_files = len(spec.files) - len(missing_files)
+    print(f"Uploading {len(missing_files)} files, {result.existing_files} already exist")
+    with WorkerPool(max_workers, boilerplate_client.dotenv_file) as pool:
+        for file, uploaded in zip(
+            missing_files,
+            pool.map(
+                upload_task,
+                repeat(model_id),
+                [file.name for file in missing_files],
+                [file.size for file in missing_files],
+            ),
+        ):
+            file_ids[file] = uploaded.get("id", uploaded.get("_id"))
+            result.uploaded_files += 1
+
+        futures = []
+        for release in spec.releases:
+            wanted_file_ids = [file_ids[file] for file in release.files]
+            existing = releases.get(version_key(release.version))
+            if existing is None:
+                print(f"Creating release {release.version} with {len(wanted_file_ids)} files")
+                futures.append(
+                    pool.submit(
+                        release_task,
+                        model_id,
+                        release.version,
+                        release.notes,
+                        model.model_card_version,
+                        wanted_file_ids,
+                        [{"repository": model_id, "name": image.name, "tag": image.tag} for image in release.images],
+                        minor=release.minor,
+                        draft=release.draft,
+                    )
+                )
+                result.created_releases += 1
+            elif set(existing["fileIds"]) != set(wanted_file_ids):
+                print(f"Updating the files of release {release.version} to {len(wanted_file_ids)} files")
+                futures.append(
+                    pool.submit(
+                        update_release_files_task,
+                        model_id,
+                        existing.get("modelCardVersion", model.model_card_version),
+                        existing,
+                        wanted_file_ids,
+                    )
+                )
+                result.updated_releases += 1
+            else:
+                result.existing_releases += 1
+        for future in as_completed(futures):
+            future.result()
+
+    print(
+        f"Uploaded {result.uploaded_files} files, created {result.created_releases} and updated "
+        f"{result.updated_releases} releases, {result.existing_releases} releases already matched"
+    )
+    return result
@@ -0,0 +1,118 @@
+"""Run one or more registered experiments in a single process, sharing one `BailoBoilerplateClient`.
+
+Experiments are only imported when they are run, so `--help` and `--list` stay fast. Options for each experiment are
+read from a TOML config (see `runner.example.toml`):
+
+```bash
+python runner.py --list
+python runner.py --config runner.toml concurrent-file-uploads many-releases-with-files
+```
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from typing import Any
+
+from registry import EXPERIMENTS, Experiment, register_plugin
+
+
+def load_config(config_file: str | None) -> dict[str, Any]:
+    """Load the runner config, registering any plugin experiments it lists.
+
+    :param config_file: Path to the TOML config, or None for an empty config.
+    :return: The loaded config.
+    """
+    if config_file is None:
+        return {}
+    try:
+        # pylint: disable-next=import-outside-toplevel
+        import tomllib
+    except ModuleNotFoundError:
+        # pylint: disable-next=import-outside-toplevel
+        import tomli as tomllib
+
+    with open(config_file, "rb") as f:
+        config = tomllib.load(f)
+    for name, target in config.get("plugins", {}).items():
+        register_plugin(name, target)
+    return config
+
+
+def run_experiments(experiments: list[Experiment], config: dict[str, Any], dry_run: bool = False) -> None:
+    """Run each experiment in order with its options from the config, sharing a client per dotenv file.
+
+    :param experiments: Experiments to run.
+    :param config: Runner config.
+    :param dry_run: Only import each experiment and check its options, defaults to False.
+    :raises TypeError: If an experiment's options do not match its entry point.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    import inspect
+
+    entry_points = {}
+    for experiment in experiments:
+        entry_point = experiment.load()
+        options = config.get("experiments", {}).get(experiment.name, {})
+        # fail before running anything if any options are wrong
+        inspect.signature(entry_point).bind(None, **options)
+        entry_points[experiment.name] = (entry_point, options)
+        print(f"{experiment.name}: {options}")
+    if dry_run:
+        return
+
+    # pylint: disable-next=import-outside-toplevel
+    from boilerplate_client import BailoBoilerplateClient
+
+    default_dotenv_file = config.get("dotenv_file", ".local.env")
+    clients: dict[str, BailoBoilerplateClient] = {}
+    for experiment in experiments:
+        entry_point, options = entry_points[experiment.name]
+        dotenv_file = config.get("dotenv_files", {}).get(experiment.name, default_dotenv_file)
+        if dotenv_file not in clients:
+            clients[dotenv_file] = BailoBoilerplateClient(dotenv_file=dotenv_file)
+        boilerplate_client = clients[dotenv_file]
+
+        # tag artefacts with the experiment, including those created by pool workers which build their own clients
+        os.environ["LEDGER_EXPERIMENT"] = experiment.name
+        if boilerplate_client.ledger:
+            boilerplate_client.ledger.experiment = experiment.name
+
+        print(f"Running {experiment.name}")
+        start = time.perf_counter()
+        if boilerplate_client.tracer:
+            with boilerplate_client.tracer.span(experiment.name, **options):
+                entry_point(boilerplate_client, **options)
+        else:
+            entry_point(boilerplate_client, **options)
+        print(f"Finished {experiment.name} in {time.perf_counter() - start:.1f}s")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run registered Bailo experiments.")
+    parser.add_argument("experiments", nargs="*", help="names of the experiments to run, in order")
+    parser.add_argument("--config", help="TOML config of experiment options, dotenv files and plugins")
+    parser.add_argument("--list", action="store_true", help="list the registered experiments and exit")
+    parser.add_argument("--dry-run", action="store_true", help="import and check each experiment without running it")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    if args.list:
+        for experiment in EXPERIMENTS.values():
+            print(f"{experiment.name:<36} {experiment.description}")
+        return
+
+    names = args.experiments or config.get("run", [])
+    if not names:
+        parser.error("no experiments given, either as arguments or as `run` in the config")
+    unknown = [name for name in names if name not in EXPERIMENTS]
+    if unknown:
+        parser.error(f"unknown experiments {unknown}, see --list")
+    run_experiments([EXPERIMENTS[name] for name in names], config, args.dry_run)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,7 +1,8 @@
 """Upload various files from the local machine to a model to test the performance of the AV scanners.
 Uses env var `SCANNERS_MODEL_ID` to save and load the same model for testing.
 
-This script does *not* download any files for you - they must be supplied yourself. Add these downloaded files to the `PATHS` variable defined later in the script.
+This script does *not* download any files for you - they must be supplied yourself. Set `PATHS_PREFIX` (or the
+`paths_prefix` option) to the directory holding these downloaded files.
 """
 
 from __future__ import annotations
@@ -13,7 +14,6 @@ from bailo import Model
 from bailo.core.exceptions import BailoException
 from bailo.helper.release import Release
 from boilerplate_client import BailoBoilerplateClient
-from dotenv import set_key
 from semantic_version import Version
 
 
@@ -79,33 +79,49 @@ class ScanPath:
                     new_release.upload(file_path)
 
 
-boilerplate_client = BailoBoilerplateClient()
-client = boilerplate_client.client
-
 MODEL_ID_ENV_VAR = "SCANNERS_MODEL_ID"
-MODEL_ID = os.getenv(MODEL_ID_ENV_VAR)
-
-if MODEL_ID:
-    # reuse existing model
-    test_model = Model.from_id(client, MODEL_ID)
-else:
-    # create a new model
-    test_model = Model.create(
-        client, "File-scanners-test", "A simple model for testing many different file formats, sizes etc."
-    )
-    set_key(boilerplate_client.dotenv_file, MODEL_ID_ENV_VAR, test_model.model_id)
-    test_model.card_from_schema()
-
 # replace this with your own path and relevant files
 PATHS_PREFIX = "</path/to.downloaded/model/files>"
-PATHS = [
-    ScanPath(test_model, f"{PATHS_PREFIX}/KerasModels/"),
-    ScanPath(test_model, f"{PATHS_PREFIX}/PyTorchModels/"),
-    ScanPath(test_model, f"{PATHS_PREFIX}/TensorFlowModels/", True),
-    ScanPath(test_model, f"{PATHS_PREFIX}/XGBoostModels/"),
-    ScanPath(test_model, f"{PATHS_PREFIX}/generated/"),
-    ScanPath(test_model, f"{PATHS_PREFIX}/big-models/"),
-]
-
-for scan_path in PATHS:
-    scan_path.upload_as_releases()
+
+
+def run(
+    boilerplate_client: BailoBoilerplateClient,
+    *,
+    paths_prefix: str = PATHS_PREFIX,
+    model_id_env_var: str = MODEL_ID_ENV_VAR,
+) -> None:
+    """Upload each directory of files under `paths_prefix` as releases of the scanners model.
+
+    :param boilerplate_client: Client to upload the files with.
+    :param paths_prefix: Directory holding the downloaded model files, defaults to PATHS_PREFIX.
+    :param model_id_env_var: Env var holding the model ID, defaults to MODEL_ID_ENV_VAR.
+    """
+    client = boilerplate_client.client
+    model_id = boilerplate_client.getenv(model_id_env_var)
+
+    if model_id:
+        # reuse existing model
+        test_model = Model.from_id(client, model_id)
+    else:
+        # create a new model
+        test_model = Model.create(
+            client, "File-scanners-test", "A simple model for testing many different file formats, sizes etc."
+        )
+        boilerplate_client.setenv(model_id_env_var, test_model.model_id)
+        test_model.card_from_schema()
+
+    paths = [
+        ScanPath(test_model, f"{paths_prefix}/KerasModels/"),
+        ScanPath(test_model, f"{paths_prefix}/PyTorchModels/"),
+        ScanPath(test_model, f"{paths_prefix}/TensorFlowModels/", True),
+        ScanPath(test_model, f"{paths_prefix}/XGBoostModels/"),
+        ScanPath(test_model, f"{paths_prefix}/generated/"),
+        ScanPath(test_model, f"{paths_prefix}/big-models/"),
+    ]
+
+    for scan_path in paths:
+        scan_path.upload_as_releases()
+
+
+if __name__ == "__main__":
+    run(BailoBoilerplateClient())
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import datetime
 
-from boilerplate_client import BailoBoilerplateClient, LazyStream
+from boilerplate_client import BailoBoilerplateClient
+from release_fixtures import MAX_WORKERS, FileSpec, FixtureSpec, ReleaseSpec, reconcile
 
 MODEL_ID_ENV_VAR = "SEVERAL_RELEASES_WITH_FILES_MODEL_ID"
 
@@ -10,48 +11,58 @@ MAX_FILE_COUNT_EXPONENT = 5
 MAX_FILE_SIZE_EXPONENT = 1
 
 
-if __name__ == "__main__":
-    boilerplate_client = BailoBoilerplateClient()
-    client = boilerplate_client.client
+def get_fixture(
+    max_file_count_exponent: int = MAX_FILE_COUNT_EXPONENT, max_file_size_exponent: int = MAX_FILE_SIZE_EXPONENT
+) -> FixtureSpec:
+    """Build release 0.m.n of 2**n files for each n below `max_file_count_exponent`, where each release of minor
+    version m sums to the same size which increases tenfold with m.
+
+    :param max_file_count_exponent: Number of file count doublings, defaults to MAX_FILE_COUNT_EXPONENT.
+    :param max_file_size_exponent: Number of tenfold release size increases, defaults to MAX_FILE_SIZE_EXPONENT.
+    :return: The fixture.
+    """
+    notes = f"Uploaded using the Bailo Python client at {datetime.datetime.now():%Y-%m-%d %H:%M:%S%z}"
+    releases = []
+    for file_size_exponent in range(max_file_size_exponent):
+        for file_count_exponent in range(max_file_count_exponent):
+            file_count = 2**file_count_exponent
+            # each release will have file_count files with summed size
+            # (2 ** (max_file_count_exponent - 1)) * (10**file_size_exponent)
+            file_size = int((2 ** (max_file_count_exponent - 1)) * (10**file_size_exponent) / file_count)
+            files = tuple(
+                FileSpec(f"blob-{file_size:_}-{file_count:_}-{file_counter:_}.blob", file_size)
+                for file_counter in range(file_count)
+            )
+            releases.append(ReleaseSpec(f"0.{file_size_exponent}.{file_count_exponent}", files, notes))
+    return FixtureSpec(releases)
+
+
+def run(
+    boilerplate_client: BailoBoilerplateClient,
+    *,
+    model_id_env_var: str = MODEL_ID_ENV_VAR,
+    max_file_count_exponent: int = MAX_FILE_COUNT_EXPONENT,
+    max_file_size_exponent: int = MAX_FILE_SIZE_EXPONENT,
+    max_workers: int = MAX_WORKERS,
+) -> None:
+    """Create releases of 2**n files for each n below `max_file_count_exponent`, where each release sums to the same
+    size. Only the files and releases missing from the model are created, so re-running is cheap.
+
+    :param boilerplate_client: Client to create the artefacts with.
+    :param model_id_env_var: Env var holding the model ID, defaults to MODEL_ID_ENV_VAR.
+    :param max_file_count_exponent: Number of file count doublings, defaults to MAX_FILE_COUNT_EXPONENT.
+    :param max_file_size_exponent: Number of tenfold release size increases, defaults to MAX_FILE_SIZE_EXPONENT.
+    :param max_workers: Number of concurrent uploads and releases, defaults to MAX_WORKERS.
+    """
     experiment_model = boilerplate_client.get_or_create_model(
-        MODEL_ID_ENV_VAR,
+        model_id_env_var,
         "Several Releases With Files Test",
         "A simple model for testing several releases with files that sum up to the same amount of bytes.",
     )
-    model_id = experiment_model.model_id
-    new_release_version = boilerplate_client.get_next_model_version(experiment_model)
-    print(f"Starting on release {new_release_version}")
+    reconcile(
+        boilerplate_client, experiment_model, get_fixture(max_file_count_exponent, max_file_size_exponent), max_workers
+    )
 
-    for file_size_exponent in range(MAX_FILE_SIZE_EXPONENT):
-        for file_count_exponent in range(MAX_FILE_COUNT_EXPONENT):
-            file_count = 2**file_count_exponent
-            # each release will have file_count files with summed size (2 ** (MAX_FILE_COUNT_EXPONENT - 1)) * (10**file_size_exponent)
-            file_size = int((2 ** (MAX_FILE_COUNT_EXPONENT - 1)) * (10**file_size_exponent) / file_count)
-
-            uploaded_file_ids = []
-            for file_counter in range(file_count):
-                print(f"Uploading file {file_counter+1} of {file_count} size {file_size:_}")
-                try:
-                    res = client.simple_upload(
-                        model_id,
-                        f"blob-{file_size:_}-{file_count:_}-{file_counter:_}.blob",
-                        LazyStream(total_size=file_size),
-                    )
-                    uploaded_file_ids.append(res.json()["file"]["id"])
-                except Exception as e:
-                    try:
-                        print(f"Exception!\n{res.text}")
-                        print(f"Exception!\n{res}")
-                    except NameError:
-                        pass
-                    raise e
-
-            print(f"Creating new release {new_release_version} with {len(uploaded_file_ids)} files")
-            notes = f"Uploaded using the Bailo Python client at {datetime.datetime.now():%Y-%m-%d %H:%M:%S%z}"
-            experiment_model.create_release(
-                new_release_version,
-                notes,
-                files=uploaded_file_ids,
-            )
-            new_release_version = new_release_version.next_patch()
-        new_release_version = new_release_version.next_minor()
+
+if __name__ == "__main__":
+    run(BailoBoilerplateClient())
@@ -0,0 +1,16 @@
+"""Summary statistics shared by the benchmarks and experiments."""
+
+from __future__ import annotations
+
+import math
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile.
+
+    :param values: Values to take the percentile of.
+    :param fraction: Percentile as a fraction e.g. 0.99.
+    :return: The percentile value.
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * fraction) - 1)]
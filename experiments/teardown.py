@@ -0,0 +1,115 @@
+"""Delete every artefact a run recorded in the artefact ledger (see `artefact_ledger.py`).
+
+Releases are deleted first, then files, then models, each kind concurrently through a rate-limited `WorkerPool`.
+Only artefacts created on the server of the given dotenv file are deleted, and any the run created elsewhere are
+reported and left in the ledger. Artefacts which no longer exist on the server are marked as deleted, and failures are
+recorded in the ledger so that teardown can simply be run again:
+
+```bash
+python teardown.py --list
+python teardown.py 20250101-120000-1a2b3c4d --max-workers 16 --rate-limit 20
+```
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from concurrent.futures import as_completed
+
+from artefact_ledger import DEFAULT_LEDGER_FILE, KINDS, ArtefactLedger
+from bailo.core.exceptions import BailoException, ResponseException
+from boilerplate_client import BailoBoilerplateClient
+from worker_pool import WorkerPool, delete_file_task, delete_model_task, delete_release_task
+
+MAX_WORKERS = 8
+RATE_LIMIT = 10.0  # deletions per second
+
+DELETE_TASKS = {
+    "release": delete_release_task,
+    "file": delete_file_task,
+    "model": delete_model_task,
+}
+
+
+def is_not_found(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 404
+
+
+def teardown(
+    ledger: ArtefactLedger,
+    run_id: str,
+    dotenv_file: str = ".local.env",
+    max_workers: int = MAX_WORKERS,
+    rate_limit: float | None = RATE_LIMIT,
+) -> dict[str, tuple[int, int]]:
+    """Delete the remaining artefacts of a run in dependency order. Artefacts created on a different server to that of
+    `dotenv_file` are skipped.
+
+    :param ledger: Ledger the run was recorded in.
+    :param run_id: Run to tear down.
+    :param dotenv_file: dotenv file of the server to delete from, which each worker's client loads, defaults to
+        ".local.env"
+    :param max_workers: Number of concurrent deletions, defaults to MAX_WORKERS.
+    :param rate_limit: Maximum deletions started per second, defaults to RATE_LIMIT.
+    :return: Mapping of kind to (deleted count, failed count).
+    """
+    base_url = BailoBoilerplateClient(dotenv_file).client.url
+    summary = {}
+    with WorkerPool(max_workers, dotenv_file, rate_limit=rate_limit) as pool:
+        for kind in KINDS:
+            remaining = []
+            skipped: dict[str, int] = {}
+            for row_id, row_base_url, model_id, artefact_id in ledger.get_remaining(run_id, kind):
+                if row_base_url == base_url:
+                    remaining.append((row_id, model_id, artefact_id))
+                else:
+                    skipped[row_base_url] = skipped.get(row_base_url, 0) + 1
+            for other_base_url, count in skipped.items():
+                print(f"Skipping {count} {kind}s created on {other_base_url or 'an unknown server'}, not {base_url}")
+            futures = {}
+            for row_id, model_id, artefact_id in remaining:
+                args = (model_id,) if kind == "model" else (model_id, artefact_id)
+                futures[pool.submit(DELETE_TASKS[kind], *args)] = (row_id, artefact_id)
+            deleted = failed = 0
+            for future in as_completed(futures):
+                row_id, artefact_id = futures[future]
+                try:
+                    future.result()
+                except (BailoException, ResponseException) as e:
+                    if not is_not_found(e):
+                        print(f"Failed to delete {kind} {artefact_id}: {e}")
+                        ledger.mark_deleted(row_id, error=str(e))
+                        failed += 1
+                        continue
+                ledger.mark_deleted(row_id)
+                deleted += 1
+            print(f"Deleted {deleted}/{len(remaining)} {kind}s")
+            summary[kind] = (deleted, failed)
+    return summary
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Delete every artefact created by a run.")
+    parser.add_argument("run_id", nargs="?", help="run to tear down, see --list")
+    parser.add_argument("--list", action="store_true", help="list the runs in the ledger and exit")
+    parser.add_argument("--ledger-file", default=DEFAULT_LEDGER_FILE, help="artefact ledger to read")
+    parser.add_argument("--dotenv-file", default=".local.env", help="dotenv file of the server to delete from")
+    parser.add_argument("--max-workers", type=int, default=MAX_WORKERS, help="number of concurrent deletions")
+    parser.add_argument("--rate-limit", type=float, default=RATE_LIMIT, help="maximum deletions started per second")
+    args = parser.parse_args(argv)
+
+    ledger = ArtefactLedger(args.ledger_file, "", experiment="teardown", run_id="teardown")
+    if args.list:
+        for run_id, experiments, base_urls, count, remaining, created_at in ledger.get_runs():
+            print(f"{run_id:<28} {created_at[:19]} {remaining:>6}/{count:<6} remaining  {experiments}  {base_urls}")
+        return
+    if not args.run_id:
+        parser.error("no run ID given, see --list")
+    summary = teardown(ledger, args.run_id, args.dotenv_file, args.max_workers, args.rate_limit)
+    if any(failed for _, failed in summary.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,342 @@
+"""Opt-in tracing of agent HTTP calls and subprocesses, exported in the Chrome trace event format.
+Traces can be opened with Perfetto (https://ui.perfetto.dev) or `chrome://tracing`.
+
+Enable tracing for any experiment by setting `TRACE_FILE` in the dotenv file (or passing `trace_file` to
+`BailoBoilerplateClient`). Any `{pid}` in the path is replaced with the process ID, which is required for experiments
+that use a `ProcessPoolExecutor` as each process writes its own trace. Per-process traces can then be merged:
+
+```bash
+python tracing.py merged.json traces/run-*.json
+```
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing.util
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Self
+
+from requests.utils import super_len
+
+HTTP_METHODS = ["get", "post", "put", "patch", "delete"]
+# path segments that are always followed by an ID in Bailo's API e.g. `/v2/model/{modelId}/release/{semver}`
+PARAMETER_PARENTS = {
+    "access-request",
+    "data-card",
+    "file",
+    "image",
+    "inference",
+    "model",
+    "model-card",
+    "release",
+    "response",
+    "review",
+    "schema",
+    "webhook",
+}
+
+logger = logging.getLogger(__name__)
+
+
+def now_us() -> int:
+    """Current wall clock time in microseconds, so that traces from separate processes line up.
+
+    :return: Microseconds since the epoch.
+    """
+    return time.time_ns() // 1000
+
+
+@dataclass
+class HttpCall:
+    """A single completed (or failed) agent HTTP call."""
+
+    method: str
+    url: str
+    kwargs: dict[str, Any]
+    start_us: int
+    end_us: int
+    response: Any = None
+    error: BaseException | None = None
+    # size of a file-like body, measured before the request reads it
+    body_size: int | None = None
+
+    @property
+    def status(self) -> int | None:
+        if self.response is not None:
+            return self.response.status_code
+        return getattr(self.error, "status_code", None)
+
+    @property
+    def bytes_out(self) -> int:
+        """Size of the request body. Streams are measured by their size rather than by reading them."""
+        data = self.kwargs.get("data")
+        if isinstance(data, (bytes, bytearray)):
+            return len(data)
+        if isinstance(data, str):
+            return len(data.encode())
+        if self.body_size is not None:
+            return self.body_size
+        if hasattr(data, "total_size"):
+            return data.total_size
+        if self.kwargs.get("json") is not None:
+            return len(json.dumps(self.kwargs["json"]).encode())
+        return 0
+
+    @property
+    def bytes_in(self) -> int:
+        """Size of the response body. Streamed responses are only measured from their `Content-Length` header."""
+        if self.response is None:
+            return 0
+        content_length = self.response.headers.get("Content-Length")
+        if content_length is not None:
+            return int(content_length)
+        if self.kwargs.get("stream"):
+            return 0
+        return len(self.response.content)
+
+
+def endpoint_template(url: str, base_url: str = "") -> str:
+    """Best-effort conversion of a formatted URL back to its endpoint template e.g. `/v2/model/{id}/files`.
+
+    :param url: Full URL of the request.
+    :param base_url: Client URL to strip from the start of the URL, defaults to "".
+    :return: The URL path with IDs replaced by `{id}`.
+    """
+    path = url.removeprefix(base_url).split("?", 1)[0]
+    segments = path.split("/")
+    return "/".join(
+        "{id}" if index > 0 and segments[index - 1] in PARAMETER_PARENTS else segment
+        for index, segment in enumerate(segments)
+    )
+
+
+def instrument_agent(agent: Any, observers: list[Callable[[HttpCall], None]]) -> None:
+    """Wrap each HTTP method of an agent in place so that every call is passed to the observers once it completes.
+
+    The agent keeps its type (e.g. `TokenAgent`) so the client still behaves the same. Agents that are never
+    instrumented have no overhead.
+
+    :param agent: Agent to instrument.
+    :param observers: Callables to pass each `HttpCall` to.
+    """
+    for http_method in HTTP_METHODS:
+        setattr(agent, http_method, _instrumented(getattr(agent, http_method), http_method.upper(), observers))
+
+
+def _instrumented(
+    request: Callable[..., Any], http_method: str, observers: list[Callable[[HttpCall], None]]
+) -> Callable[..., Any]:
+    def wrapper(url, *args, **kwargs):
+        data = kwargs.get("data")
+        # file-like bodies (e.g. `BytesIO` or open files) are consumed by the request, so are measured beforehand
+        body_size = super_len(data) if hasattr(data, "read") else None
+        start_us = now_us()
+        response = None
+        error = None
+        try:
+            response = request(url, *args, **kwargs)
+            return response
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            call = HttpCall(http_method, url, kwargs, start_us, now_us(), response, error, body_size)
+            for observer in observers:
+                # never let an observer replace the response or the original error
+                try:
+                    observer(call)
+                except Exception:  # pylint: disable=broad-exception-caught
+                    logger.exception("Observer %s failed for %s %s", observer, http_method, url)
+
+    return wrapper
+
+
+class ProcessOutput:
+    """Base for collectors shared by every client in a process, which write what they collected as JSON to one file
+    per process on exit."""
+
+    # indent of the written JSON, None for the most compact output
+    indent: int | None = None
+
+    def __init__(self, output_file: str):
+        """
+        :param output_file: Path to write to. Any `{pid}` is replaced with the process ID.
+        """
+        self.output_file = output_file
+        self._lock = threading.Lock()
+        # unlike atexit, this also runs when multiprocessing pool workers exit
+        multiprocessing.util.Finalize(None, self.dump, exitpriority=10)
+
+    def get_output(self) -> dict[str, Any] | None:
+        """Build the JSON to write. Called with the lock held.
+
+        :return: The JSON to write, or None if nothing was collected.
+        """
+        raise NotImplementedError
+
+    def dump(self) -> None:
+        """Write everything collected to `output_file` (with `{pid}` replaced by this process' ID)."""
+        with self._lock:
+            output = self.get_output()
+        if output is None:
+            return
+        output_file = self.output_file.format(pid=os.getpid())
+        if os.path.dirname(output_file):
+            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=self.indent)
+
+    @classmethod
+    def get_shared(cls, output_file: str, *args: Any) -> Self:
+        """Get the instance for `output_file` in this process, so that every client in a process (e.g. one per pool
+        worker thread) writes to the same file rather than overwriting each other's.
+
+        :param output_file: Path to write to. Any `{pid}` is replaced with the process ID.
+        :param args: Further arguments to create the instance with if there isn't one yet.
+        :return: The shared instance.
+        """
+        # key by process ID as forked processes inherit the parent's instances
+        key = (cls, os.getpid(), output_file)
+        with _shared_lock:
+            if key not in _shared:
+                _shared[key] = cls(output_file, *args)
+            return _shared[key]
+
+
+_shared: dict[tuple[type[ProcessOutput], int, str], Any] = {}
+_shared_lock = threading.Lock()
+
+
+class Tracer(ProcessOutput):
+    """Collect trace events for this process and write them to `trace_file` on exit."""
+
+    def __init__(self, trace_file: str, base_url: str = "", process_name: str | None = None):
+        """
+        :param trace_file: Path to write the trace to. Any `{pid}` is replaced with the process ID.
+        :param base_url: Client URL to strip from traced URLs, defaults to "".
+        :param process_name: Name to show for this process in the trace, defaults to None in which case the script name
+            is used.
+        """
+        super().__init__(trace_file)
+        self.base_url = base_url
+        self.process_name = process_name or os.path.basename(sys.argv[0])
+        self.events: list[dict[str, Any]] = []
+
+    def _add_event(self, name: str, category: str, start_us: int, end_us: int, args: dict[str, Any]) -> None:
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start_us,
+            "dur": end_us - start_us,
+            "pid": os.getpid(),
+            "tid": threading.get_native_id(),
+            "args": args,
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def record_http(self, call: HttpCall) -> None:
+        """Observer for `instrument_agent` which records the call as a trace event.
+
+        :param call: The completed HTTP call.
+        """
+        template = endpoint_template(call.url, self.base_url)
+        self._add_event(
+            f"{call.method} {template}",
+            "http",
+            call.start_us,
+            call.end_us,
+            {
+                "method": call.method,
+                "endpoint": template,
+                "status": call.status,
+                "bytes_out": call.bytes_out,
+                "bytes_in": call.bytes_in,
+                "error": repr(call.error) if call.error is not None else None,
+            },
+        )
+
+    @contextmanager
+    def span(self, name: str, category: str = "experiment", **args: Any) -> Iterator[None]:
+        """Record the time taken by a block of code e.g. a whole experiment stage.
+
+        :param name: Name of the span.
+        :param category: Trace category, defaults to "experiment".
+        :param args: Extra values to attach to the trace event.
+        """
+        start_us = now_us()
+        try:
+            yield
+        finally:
+            self._add_event(name, category, start_us, now_us(), args)
+
+    def run_subprocess(self, args: list[str], **kwargs: Any) -> subprocess.CompletedProcess:
+        """Run `subprocess.run` and record it as a trace event.
+
+        :param args: Command to run.
+        :param kwargs: Keyword arguments to `subprocess.run`.
+        :return: The completed process.
+        """
+        start_us = now_us()
+        returncode = None
+        try:
+            result = subprocess.run(args, check=kwargs.pop("check", False), **kwargs)
+            returncode = result.returncode
+            return result
+        except subprocess.CalledProcessError as e:
+            returncode = e.returncode
+            raise
+        finally:
+            # only the command and subcommand, as later arguments may contain secrets e.g. `docker login -p`
+            self._add_event(" ".join(args[:2]), "subprocess", start_us, now_us(), {"returncode": returncode})
+
+    def get_output(self) -> dict[str, Any] | None:
+        if not self.events:
+            return None
+        return {
+            "traceEvents": [
+                {"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": self.process_name}},
+                *self.events,
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+
+def get_tracer(trace_file: str, base_url: str = "") -> Tracer:
+    """Get the tracer for `trace_file` in this process, shared by every client in the process.
+
+    :param trace_file: Path to write the trace to. Any `{pid}` is replaced with the process ID.
+    :param base_url: Client URL to strip from traced URLs, defaults to "".
+    :return: The shared tracer.
+    """
+    return Tracer.get_shared(trace_file, base_url)
+
+
+def merge_traces(output_file: str, trace_files: list[str]) -> None:
+    """Merge several per-process trace files into one.
+
+    :param output_file: Path to write the merged trace to.
+    :param trace_files: Paths of the traces to merge.
+    """
+    events = []
+    for trace_file in trace_files:
+        with open(trace_file, encoding="utf-8") as f:
+            events.extend(json.load(f)["traceEvents"])
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        raise SystemExit(f"Usage: {sys.argv[0]} <output.json> <trace.json> [<trace.json> ...]")
+    merge_traces(sys.argv[1], sys.argv[2:])
@@ -0,0 +1,122 @@
+"""Record the API operations made through `BailoBoilerplateClient` so they can be replayed with `traffic_replay.py`.
+
+Enable recording by setting `RECORD_FILE` in the dotenv file (or passing `record_file` to `BailoBoilerplateClient`).
+As with `TRACE_FILE`, any `{pid}` in the path is replaced with the process ID. Only the method, path, query parameters,
+JSON body (with secret-looking keys redacted), body size and timing of each call are stored. Headers and auth are
+never recorded, and binary request bodies are only recorded by size.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from tracing import HttpCall, ProcessOutput
+
+REDACTED = "<redacted>"
+SECRET_KEY_REGEX = re.compile(r"secret|password|token|authori[sz]ation|credential|access_?key", re.IGNORECASE)
+ID_KEY_REGEX = re.compile(r"(^_?id$)|(Id$)")
+
+
+def redact(value: Any) -> Any:
+    """Recursively replace the values of any secret-looking keys.
+
+    :param value: JSON value to redact.
+    :return: A redacted copy of the value.
+    """
+    if isinstance(value, dict):
+        return {k: REDACTED if SECRET_KEY_REGEX.search(k) else redact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact(v) for v in value]
+    return value
+
+
+def is_json_response(response: requests.Response) -> bool:
+    """Whether a response has a JSON body, regardless of whether the request was streamed (as uploads are).
+
+    :param response: The response.
+    :return: Whether the response is JSON.
+    """
+    return response.headers.get("Content-Type", "").split(";")[0].strip().endswith("json")
+
+
+def find_ids(value: Any) -> list[str]:
+    """Recursively collect the non-empty values of ID keys (e.g. `id`, `_id`, `modelId`) in the order they appear.
+
+    :param value: JSON value to search.
+    :return: List of IDs.
+    """
+    ids = []
+    if isinstance(value, dict):
+        for k, v in value.items():
+            if isinstance(v, str) and v and ID_KEY_REGEX.search(k):
+                ids.append(v)
+            else:
+                ids.extend(find_ids(v))
+    elif isinstance(value, list):
+        for v in value:
+            ids.extend(find_ids(v))
+    return ids
+
+
+class TrafficRecorder(ProcessOutput):
+    """Record each agent HTTP call made in this process and write them to `record_file` on exit."""
+
+    indent = 1
+
+    def __init__(self, record_file: str, base_url: str):
+        """
+        :param record_file: Path to write the recording to. Any `{pid}` is replaced with the process ID.
+        :param base_url: Client URL to strip from recorded URLs so that they can be replayed against another server.
+        """
+        super().__init__(record_file)
+        self.base_url = base_url
+        self.operations: list[dict[str, Any]] = []
+        self._start_us = time.time_ns() // 1000
+
+    def record_http(self, call: HttpCall) -> None:
+        """Observer for `instrument_agent` which records the call as an operation.
+
+        :param call: The completed HTTP call.
+        """
+        url = urlsplit(call.url.removeprefix(self.base_url))
+        data = call.kwargs.get("data")
+        response_ids = []
+        if call.method == "POST" and call.response is not None and is_json_response(call.response):
+            try:
+                response_ids = find_ids(call.response.json())
+            except ValueError:
+                pass
+        operation = {
+            "offset": (call.start_us - self._start_us) / 1_000_000,
+            "duration": (call.end_us - call.start_us) / 1_000_000,
+            "method": call.method,
+            "path": url.path,
+            "query": url.query,
+            "params": redact(call.kwargs.get("params")),
+            "json": redact(call.kwargs.get("json")),
+            "body_size": call.bytes_out if data is not None else None,
+            "stream": bool(call.kwargs.get("stream")),
+            "status": call.status,
+            "response_ids": response_ids,
+        }
+        with self._lock:
+            self.operations.append(operation)
+
+    def get_output(self) -> dict[str, Any] | None:
+        if not self.operations:
+            return None
+        return {"operations": sorted(self.operations, key=lambda operation: operation["offset"])}
+
+
+def get_recorder(record_file: str, base_url: str) -> TrafficRecorder:
+    """Get the recorder for `record_file` in this process, shared by every client in the process.
+
+    :param record_file: Path to write the recording to. Any `{pid}` is replaced with the process ID.
+    :param base_url: Client URL to strip from recorded URLs.
+    :return: The shared recorder.
+    """
+    return TrafficRecorder.get_shared(record_file, base_url)
@@ -0,0 +1,165 @@
+"""Record the API operations of any experiment run, then replay them against another Bailo instance.
+
+Enable recording by setting `RECORD_FILE` in the dotenv file (see `traffic_recorder.py`). Binary request bodies are
+not recorded, and are regenerated on replay with `LazyStream` of the recorded size.
+
+IDs returned by `POST` responses (e.g. a created model or file) are mapped to the IDs returned by the target server
+during replay, so later operations on those artefacts go to the replayed copies.
+
+Replay one or more recordings, each `--concurrency` times in parallel, at `--speed` times the recorded pace:
+
+```bash
+python traffic_replay.py recordings/run-1234.json --dotenv-file .target.env --speed 2 --concurrency 4
+```
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from urllib.parse import parse_qsl, urlencode
+
+from bailo.core.exceptions import BailoException, ResponseException
+from boilerplate_client import BailoBoilerplateClient, LazyStream
+from requests.exceptions import RequestException
+from stats import percentile
+from tracing import endpoint_template
+from traffic_recorder import find_ids, is_json_response
+
+
+def substitute_ids(value: Any, id_map: dict[str, str]) -> Any:
+    """Recursively replace any recorded IDs with their replayed equivalent.
+
+    :param value: JSON value to update.
+    :param id_map: Mapping of recorded ID to replayed ID.
+    :return: An updated copy of the value.
+    """
+    if isinstance(value, str):
+        return id_map.get(value, value)
+    if isinstance(value, dict):
+        return {k: substitute_ids(v, id_map) for k, v in value.items()}
+    if isinstance(value, list):
+        return [substitute_ids(v, id_map) for v in value]
+    return value
+
+
+def replay_sequence(
+    operations: list[dict[str, Any]], boilerplate_client: BailoBoilerplateClient, speed: float = 1.0
+) -> list[tuple[str, float, bool]]:
+    """Re-issue a recorded sequence of operations in order, keeping the recorded pacing scaled by `speed`.
+
+    :param operations: Recorded operations.
+    :param boilerplate_client: Client for the target server.
+    :param speed: Speed multiplier, e.g. 2 replays twice as fast, defaults to 1.0.
+    :return: List of (endpoint template, latency in seconds, succeeded) for each operation.
+    """
+    agent = boilerplate_client.agent
+    base_url = boilerplate_client.client.url
+    id_map: dict[str, str] = {}
+    results = []
+    start = time.perf_counter()
+    for operation in operations:
+        delay = operation["offset"] / speed - (time.perf_counter() - start)
+        if delay > 0:
+            time.sleep(delay)
+
+        path = "/".join(id_map.get(segment, segment) for segment in operation["path"].split("/"))
+        url = f"{base_url}{path}"
+        if operation["query"]:
+            query = [(k, id_map.get(v, v)) for k, v in parse_qsl(operation["query"], keep_blank_values=True)]
+            url = f"{url}?{urlencode(query)}"
+        kwargs: dict[str, Any] = {"stream": operation["stream"]}
+        if operation["params"] is not None:
+            kwargs["params"] = substitute_ids(operation["params"], id_map)
+        if operation["json"] is not None:
+            kwargs["json"] = substitute_ids(operation["json"], id_map)
+        if operation["body_size"] is not None:
+            kwargs["data"] = LazyStream(total_size=operation["body_size"])
+
+        request_start = time.perf_counter()
+        succeeded = True
+        try:
+            response = getattr(agent, operation["method"].lower())(url, **kwargs)
+            # uploads are sent with `stream=True` but still return JSON with the created file's ID
+            if is_json_response(response):
+                if operation["response_ids"]:
+                    id_map.update(zip(operation["response_ids"], find_ids(response.json())))
+            elif operation["stream"]:
+                for _ in response.iter_content(chunk_size=1024**2):
+                    pass
+        except (BailoException, ResponseException, RequestException, ValueError) as e:
+            print(f"Failed {operation['method']} {path}: {e}")
+            succeeded = False
+        results.append(
+            (
+                f"{operation['method']} {endpoint_template(path)}",
+                time.perf_counter() - request_start,
+                succeeded,
+            )
+        )
+    return results
+
+
+def replay(
+    recordings: list[list[dict[str, Any]]],
+    boilerplate_client: BailoBoilerplateClient,
+    speed: float = 1.0,
+    concurrency: int = 1,
+) -> dict[str, list[tuple[float, bool]]]:
+    """Replay each recording `concurrency` times in parallel.
+
+    :param recordings: Recorded operation sequences, e.g. one per recorded process.
+    :param boilerplate_client: Client for the target server.
+    :param speed: Speed multiplier, defaults to 1.0.
+    :param concurrency: Number of copies of each recording to replay at once, defaults to 1.
+    :return: Mapping of endpoint template to a list of (latency in seconds, succeeded).
+    """
+    results: defaultdict[str, list[tuple[float, bool]]] = defaultdict(list)
+    sequences = [operations for operations in recordings for _ in range(concurrency)]
+    with ThreadPoolExecutor(max_workers=len(sequences)) as executor:
+        for sequence_results in executor.map(
+            lambda operations: replay_sequence(operations, boilerplate_client, speed), sequences
+        ):
+            for endpoint, latency, succeeded in sequence_results:
+                results[endpoint].append((latency, succeeded))
+    return results
+
+
+def print_summary(results: dict[str, list[tuple[float, bool]]]) -> None:
+    """Print the count, error count and latency percentiles of each endpoint.
+
+    :param results: Result of `replay`.
+    """
+    print(f"{'endpoint':<60} {'count':>7} {'errors':>7} {'p50 ms':>9} {'p99 ms':>9}")
+    for endpoint, endpoint_results in sorted(results.items()):
+        latencies = [latency * 1000 for latency, _ in endpoint_results]
+        errors = sum(1 for _, succeeded in endpoint_results if not succeeded)
+        print(
+            f"{endpoint:<60} {len(latencies):>7} {errors:>7} {statistics.median(latencies):>9.1f} "
+            f"{percentile(latencies, 0.99):>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded experiment traffic against a Bailo instance.")
+    parser.add_argument("recordings", nargs="+", help="recording files written via RECORD_FILE")
+    parser.add_argument("--dotenv-file", default=".local.env", help="dotenv file for the target server")
+    parser.add_argument("--speed", type=float, default=1.0, help="speed multiplier e.g. 2 for twice as fast")
+    parser.add_argument("--concurrency", type=int, default=1, help="copies of each recording to replay at once")
+    args = parser.parse_args()
+
+    loaded_recordings = []
+    for recording in args.recordings:
+        with open(recording, encoding="utf-8") as recording_file:
+            loaded_recordings.append(json.load(recording_file)["operations"])
+
+    target_client = BailoBoilerplateClient(dotenv_file=args.dotenv_file)
+    replay_start = time.perf_counter()
+    replay_results = replay(loaded_recordings, target_client, args.speed, args.concurrency)
+    print(f"Replayed in {time.perf_counter() - replay_start:.1f}s")
+    print_summary(replay_results)
@@ -0,0 +1,367 @@
+"""Sweep a grid of upload parameters (chunk size, file size, concurrency and per-stream rate limit) and report the
+throughput and latency of each combination, repeated for confidence intervals, along with the best combination.
+
+The target is either the Bailo instance in the dotenv file, using the model in `UPLOAD_BENCHMARK_MODEL_ID`, or a
+built-in local stub server which reads and discards upload bodies, to measure the client side on its own:
+
+```bash
+python upload_benchmark.py --stub --chunk-sizes 65536,1048576 --file-sizes 1048576,20971520 --concurrencies 1,4,8
+python upload_benchmark.py --dotenv-file .local.env --repeats 5 --results-file results.csv
+```
+
+Note that `LazyStream.read` is only ever called with the HTTP library's own block size, so `chunk_size` has no effect
+on a `LazyStream` passed directly to `simple_upload`. Uploads here are wrapped in `ChunkedBody` so that each chunk
+written to the socket really is `chunk_size` bytes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import statistics
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from boilerplate_client import BailoBoilerplateClient, LazyStream
+from stats import percentile
+from worker_pool import WorkerPool
+
+MODEL_ID_ENV_VAR = "UPLOAD_BENCHMARK_MODEL_ID"
+CHUNK_SIZES = [64 * 1024, 1024**2]
+FILE_SIZES = [1024**2, 20 * 1024**2]
+CONCURRENCIES = [1, 4, 8]
+RATE_LIMITS: list[int | None] = [None]
+REPEATS = 3
+UPLOADS_PER_WORKER = 4
+# two-sided 95% critical values of Student's t distribution for 1 to 30 degrees of freedom
+T_95 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228, 2.201, 2.179, 2.160, 2.145, 2.131]
+T_95 += [2.120, 2.110, 2.101, 2.093, 2.086, 2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+
+
+class ChunkedBody:
+    """Iterable over a `LazyStream` in `chunk_size` chunks, with a length so it is still sent with a Content-Length."""
+
+    def __init__(self, stream: LazyStream):
+        """
+        :param stream: Stream to upload.
+        """
+        self.stream = stream
+
+    def __len__(self) -> int:
+        return self.stream.total_size - self.stream.position
+
+    def __iter__(self) -> Iterator[bytes]:
+        while chunk := self.stream.read(self.stream.chunk_size):
+            yield chunk
+
+
+@dataclass(frozen=True)
+class Cell:
+    """One combination of parameters in the grid."""
+
+    chunk_size: int
+    file_size: int
+    concurrency: int
+    rate_limit: int | None
+
+
+@dataclass
+class CellResult:
+    """Throughput of each repeat of a cell, and the latency of every upload in it."""
+
+    cell: Cell
+    throughputs: list[float] = field(default_factory=list)
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def mean_throughput(self) -> float:
+        return statistics.fmean(self.throughputs) if self.throughputs else 0.0
+
+    @property
+    def throughput_ci(self) -> float:
+        """Half width of the 95% confidence interval of the mean throughput."""
+        if len(self.throughputs) < 2:
+            return math.inf
+        t = T_95[min(len(self.throughputs) - 1, len(T_95)) - 1]
+        return t * statistics.stdev(self.throughputs) / math.sqrt(len(self.throughputs))
+
+
+def upload_timed_task(
+    boilerplate_client: BailoBoilerplateClient,
+    model_id: str,
+    name: str,
+    file_size: int,
+    chunk_size: int,
+    rate_limit: int | None,
+) -> float:
+    """Upload a `LazyStream` in `chunk_size` chunks.
+
+    :param boilerplate_client: Worker's client.
+    :param model_id: Model to upload to.
+    :param name: File name.
+    :param file_size: File size in bytes.
+    :param chunk_size: Size of each chunk written.
+    :param rate_limit: `LazyStream` rate limit in bytes/second.
+    :return: Duration of the upload in seconds.
+    """
+    stream = LazyStream(chunk_size=chunk_size, total_size=file_size, rate_limit=rate_limit)
+    start = time.perf_counter()
+    boilerplate_client.client.simple_upload(model_id, name, ChunkedBody(stream))
+    return time.perf_counter() - start
+
+
+def _warm_up_task(_boilerplate_client: BailoBoilerplateClient, _index: int) -> None:
+    return None
+
+
+def benchmark_cell(
+    cell: Cell, model_id: str, dotenv_file: str, repeats: int, uploads_per_worker: int, use_processes: bool
+) -> CellResult:
+    """Time `repeats` rounds of `uploads_per_worker * concurrency` uploads through one pool of `concurrency` workers.
+
+    :param cell: Parameters to benchmark.
+    :param model_id: Model to upload to.
+    :param dotenv_file: dotenv file each worker's client loads.
+    :param repeats: Number of timed rounds.
+    :param uploads_per_worker: Number of uploads per worker in each round.
+    :param use_processes: Use a process pool rather than a thread pool.
+    :return: Result of the cell.
+    """
+    result = CellResult(cell)
+    upload_count = uploads_per_worker * cell.concurrency
+    with WorkerPool(cell.concurrency, dotenv_file, use_processes=use_processes) as pool:
+        # build every worker's client before timing anything
+        list(pool.map(_warm_up_task, range(cell.concurrency)))
+        for repeat_index in range(repeats):
+            names = [f"upload-benchmark-{repeat_index}-{i}" for i in range(upload_count)]
+            start = time.perf_counter()
+            futures = [
+                pool.submit(upload_timed_task, model_id, name, cell.file_size, cell.chunk_size, cell.rate_limit)
+                for name in names
+            ]
+            uploaded = 0
+            for future in futures:
+                try:
+                    result.latencies.append(future.result())
+                    uploaded += 1
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    print(f"Upload failed: {e}")
+                    result.errors += 1
+            result.throughputs.append(uploaded * cell.file_size / (time.perf_counter() - start))
+    return result
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        remaining = int(self.headers.get("Content-Length") or 0)
+        while remaining > 0:
+            remaining -= len(self.rfile.read(min(remaining, 1024**2)))
+        body = json.dumps({"file": {"id": os.urandom(12).hex()}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+def serve_stub(port_queue: multiprocessing.Queue) -> None:
+    """Serve the stub upload endpoint on a free port, putting the port on `port_queue` once listening."""
+    server = ThreadingHTTPServer(("localhost", 0), _StubHandler)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+_stub_url: str | None = None
+
+
+@contextmanager
+def stub_target() -> Iterator[str]:
+    """Run the stub server in its own process, pointing every client created inside the context at it. Nested contexts
+    reuse the stub server that is already running.
+
+    :return: The stub server's URL.
+    """
+    global _stub_url  # pylint: disable=global-statement
+    if _stub_url is not None:
+        yield _stub_url
+        return
+    port_queue: multiprocessing.Queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve_stub, args=(port_queue,), daemon=True)
+    process.start()
+    url = f"http://localhost:{port_queue.get(timeout=10)}"
+    # existing env vars take precedence over the dotenv file, and nothing uploaded to the stub needs tearing down
+    overrides = {"URL": url, "LEDGER_FILE": ""}
+    previous = {key: os.environ.get(key) for key in overrides}
+    os.environ.update(overrides)
+    _stub_url = url
+    try:
+        yield url
+    finally:
+        _stub_url = None
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        process.terminate()
+        process.join()
+
+
+def print_results(results: list[CellResult]) -> None:
+    print(
+        f"{'chunk':>9} {'file size':>12} {'workers':>7} {'rate limit':>11} {'MB/s':>8} {'± 95%':>7} "
+        f"{'p50 s':>7} {'p99 s':>7} {'errors':>6}"
+    )
+    for result in results:
+        cell = result.cell
+        latencies = result.latencies or [math.nan]
+        print(
+            f"{cell.chunk_size:>9_} {cell.file_size:>12_} {cell.concurrency:>7} {str(cell.rate_limit):>11} "
+            f"{result.mean_throughput / 1024**2:>8.1f} {result.throughput_ci / 1024**2:>7.1f} "
+            f"{statistics.median(latencies):>7.2f} {percentile(latencies, 0.99):>7.2f} {result.errors:>6}"
+        )
+
+
+def write_results(results: list[CellResult], results_file: str) -> None:
+    with open(results_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["chunk_size", "file_size", "concurrency", "rate_limit", "mean_bps", "ci_bps", "p50_s", "p99_s", "errors"]
+        )
+        for result in results:
+            cell = result.cell
+            latencies = result.latencies or [math.nan]
+            writer.writerow(
+                [
+                    cell.chunk_size,
+                    cell.file_size,
+                    cell.concurrency,
+                    cell.rate_limit,
+                    result.mean_throughput,
+                    result.throughput_ci,
+                    statistics.median(latencies),
+                    percentile(latencies, 0.99),
+                    result.errors,
+                ]
+            )
+
+
+def run(
+    boilerplate_client: BailoBoilerplateClient,
+    *,
+    chunk_sizes: list[int] | None = None,
+    file_sizes: list[int] | None = None,
+    concurrencies: list[int] | None = None,
+    rate_limits: list[int | None] | None = None,
+    repeats: int = REPEATS,
+    uploads_per_worker: int = UPLOADS_PER_WORKER,
+    use_processes: bool = True,
+    stub: bool = False,
+    model_id_env_var: str = MODEL_ID_ENV_VAR,
+    results_file: str | None = None,
+) -> list[CellResult]:
+    """Benchmark every combination of the given parameters.
+
+    :param boilerplate_client: Client used to find or create the model. Each worker builds its own client from the same
+        dotenv file.
+    :param chunk_sizes: Chunk sizes in bytes, defaults to None in which case CHUNK_SIZES is used.
+    :param file_sizes: File sizes in bytes, defaults to None in which case FILE_SIZES is used.
+    :param concurrencies: Numbers of concurrent uploads, defaults to None in which case CONCURRENCIES is used.
+    :param rate_limits: Per-upload rate limits in bytes/second (None for unlimited), defaults to None in which case
+        RATE_LIMITS is used.
+    :param repeats: Number of timed rounds of each combination, defaults to REPEATS.
+    :param uploads_per_worker: Number of uploads per worker in each round, defaults to UPLOADS_PER_WORKER.
+    :param use_processes: Upload from processes rather than threads, defaults to True.
+    :param stub: Upload to a local stub server rather than the client's Bailo instance, defaults to False.
+    :param model_id_env_var: Env var holding the model ID, defaults to MODEL_ID_ENV_VAR.
+    :param results_file: CSV file to write the results to, defaults to None.
+    :return: Result of each combination.
+    """
+    cells = [
+        Cell(*values)
+        for values in itertools.product(
+            chunk_sizes or CHUNK_SIZES,
+            file_sizes or FILE_SIZES,
+            concurrencies or CONCURRENCIES,
+            rate_limits or RATE_LIMITS,
+        )
+    ]
+    dotenv_file = boilerplate_client.dotenv_file
+    results = []
+    with stub_target() if stub else nullcontext():
+        if stub:
+            model_id = "stub"
+        else:
+            model_id = boilerplate_client.get_or_create_model(
+                model_id_env_var, "Upload-benchmark", "A simple model for benchmarking uploads."
+            ).model_id
+        for i, cell in enumerate(cells, 1):
+            print(f"Benchmarking {i}/{len(cells)}: {cell}")
+            results.append(benchmark_cell(cell, model_id, dotenv_file, repeats, uploads_per_worker, use_processes))
+
+    print_results(results)
+    if results_file:
+        write_results(results, results_file)
+    best = max(results, key=lambda result: (result.errors == 0, result.mean_throughput))
+    print(f"Best: {best.cell} at {best.mean_throughput / 1024**2:.1f} ± {best.throughput_ci / 1024**2:.1f} MB/s")
+    return results
+
+
+def parse_sizes(value: str) -> list[int | None]:
+    return [None if size.lower() == "none" else int(size) for size in value.split(",")]
+
+
+def parse_counts(value: str) -> list[int]:
+    return [int(count) for count in value.split(",")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sweep upload parameters and report throughput and latency.")
+    parser.add_argument("--dotenv-file", default=".local.env", help="dotenv file for the target server")
+    parser.add_argument("--stub", action="store_true", help="upload to a built-in local stub server instead")
+    parser.add_argument("--chunk-sizes", type=parse_sizes, default=CHUNK_SIZES, help="comma separated bytes")
+    parser.add_argument("--file-sizes", type=parse_sizes, default=FILE_SIZES, help="comma separated bytes")
+    parser.add_argument("--concurrencies", type=parse_counts, default=CONCURRENCIES, help="comma separated counts")
+    parser.add_argument(
+        "--rate-limits", type=parse_sizes, default=RATE_LIMITS, help="comma separated bytes/second or none"
+    )
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="timed rounds of each combination")
+    parser.add_argument(
+        "--uploads-per-worker", type=int, default=UPLOADS_PER_WORKER, help="uploads per worker per round"
+    )
+    parser.add_argument("--threads", action="store_true", help="upload from threads rather than processes")
+    parser.add_argument("--results-file", help="CSV file to write the results to")
+    args = parser.parse_args()
+
+    # with --stub the client is built against the same stub that `run` uploads to, so that a dotenv file is not needed
+    with stub_target() if args.stub else nullcontext():
+        run(
+            BailoBoilerplateClient(dotenv_file=args.dotenv_file),
+            chunk_sizes=args.chunk_sizes,
+            file_sizes=args.file_sizes,
+            concurrencies=args.concurrencies,
+            rate_limits=args.rate_limits,
+            repeats=args.repeats,
+            uploads_per_worker=args.uploads_per_worker,
+            use_processes=not args.threads,
+            stub=args.stub,
+            results_file=args.results_file,
+        )
+
+
+if __name__ == "__main__":
+    main()
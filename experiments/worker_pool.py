@@ -0,0 +1,249 @@
+"""Persistent process or thread pool where each worker builds one `BailoBoilerplateClient` and reuses it for every task.
+
+This avoids reloading the dotenv file, creating a new agent and opening new connections for every task. Tasks are any
+picklable callable taking the worker's client as the first argument, such as `upload_task`, `release_task` and the
+delete tasks below. Example usage:
+
+```python
+from worker_pool import WorkerPool, upload_task
+
+with WorkerPool(max_workers=8, use_processes=True) as pool:
+    for file in pool.map(upload_task, repeat(model_id), names, sizes):
+        print(file["id"])
+```
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+from bailo.helper.release import Release
+from boilerplate_client import BailoBoilerplateClient, LazyStream
+from metrics import MeteredStream, Metrics
+
+_worker_state = threading.local()
+
+
+def _initialise_worker(dotenv_file: str, metrics: Metrics | None = None) -> None:
+    """Build the client for this worker. Runs once in each worker process or thread."""
+    _worker_state.boilerplate_client = BailoBoilerplateClient(dotenv_file=dotenv_file)
+    _worker_state.metrics = metrics
+
+
+def get_worker_client() -> BailoBoilerplateClient:
+    """Get the client of the current pool worker.
+
+    :return: The worker's client.
+    """
+    return _worker_state.boilerplate_client
+
+
+def get_worker_metrics() -> Metrics | None:
+    """Get the metrics of the current pool worker.
+
+    :return: The pool's metrics, or None if the pool has none or this is not a pool worker.
+    """
+    return getattr(_worker_state, "metrics", None)
+
+
+def _call_with_client(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    metrics = get_worker_metrics()
+    if metrics is None:
+        return fn(get_worker_client(), *args, **kwargs)
+    metrics.add("started")
+    metrics.add("in_flight")
+    try:
+        result = fn(get_worker_client(), *args, **kwargs)
+    except Exception:
+        metrics.add("errors")
+        raise
+    finally:
+        metrics.add("in_flight", -1)
+    metrics.add("finished")
+    return result
+
+
+def _call_rate_limited(rate_limiter: RateLimiter, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    rate_limiter.acquire()
+    return _call_with_client(fn, *args, **kwargs)
+
+
+class RateLimiter:
+    """Thread safe limit on how many calls can start per second, shared by every worker of a thread pool."""
+
+    def __init__(self, calls_per_second: float):
+        """
+        :param calls_per_second: Maximum rate at which `acquire` returns.
+        """
+        self._interval = 1 / calls_per_second
+        self._next_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until the next call is allowed to start."""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_time - now
+            self._next_time = max(now, self._next_time) + self._interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class WorkerPool:
+    """Process or thread pool whose workers each hold one `BailoBoilerplateClient` for their lifetime."""
+
+    def __init__(
+        self,
+        max_workers: int,
+        dotenv_file: str = ".local.env",
+        use_processes: bool = False,
+        rate_limit: float | None = None,
+        metrics: Metrics | None = None,
+    ):
+        """
+        :param max_workers: Number of workers.
+        :param dotenv_file: dotenv file each worker's client loads, defaults to ".local.env"
+        :param use_processes: Use a process pool rather than a thread pool, defaults to False.
+            Tasks (and their arguments) must be picklable when using processes.
+        :param rate_limit: Maximum number of tasks to start per second, defaults to None (unlimited).
+        :param metrics: Shared metrics for the workers to count their tasks into (see `metrics.py`), defaults to None.
+        :raises ValueError: If a rate limit is used with a process pool.
+        """
+        if use_processes and rate_limit is not None:
+            raise ValueError("rate_limit is only supported by thread pools")
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._executor: Executor = executor_class(
+            max_workers=max_workers, initializer=_initialise_worker, initargs=(dotenv_file, metrics)
+        )
+        self._call: Callable[..., Any] = _call_with_client
+        if rate_limit is not None:
+            self._call = functools.partial(_call_rate_limited, RateLimiter(rate_limit))
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Schedule `fn(worker_client, *args, **kwargs)` on a worker.
+
+        :param fn: Task to run.
+        :return: Future of the task's result.
+        """
+        return self._executor.submit(self._call, fn, *args, **kwargs)
+
+    def map(self, fn: Callable[..., Any], *iterables: Iterable[Any]) -> Iterator[Any]:
+        """Run `fn(worker_client, *args)` for each set of args from `iterables`, like `Executor.map`.
+
+        :param fn: Task to run.
+        :return: Iterator of the results in order.
+        """
+        return self._executor.map(functools.partial(self._call, fn), *iterables)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> WorkerPool:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown()
+
+
+def upload_task(
+    boilerplate_client: BailoBoilerplateClient,
+    model_id: str,
+    name: str,
+    size: int,
+    chunk_size: int = 1024**2,
+    rate_limit: int | None = None,
+) -> dict[str, Any]:
+    """Upload a `LazyStream` of `size` bytes, counting the bytes sent if the pool has metrics.
+
+    :param boilerplate_client: Worker's client.
+    :param model_id: Model to upload to.
+    :param name: File name.
+    :param size: File size in bytes.
+    :param chunk_size: `LazyStream` chunk size, defaults to 1MB.
+    :param rate_limit: `LazyStream` rate limit in bytes/second, defaults to None.
+    :return: The uploaded file object.
+    """
+    stream = LazyStream(chunk_size=chunk_size, total_size=size, rate_limit=rate_limit)
+    metrics = get_worker_metrics()
+    res = boilerplate_client.client.simple_upload(
+        model_id, name, stream if metrics is None else MeteredStream(stream, metrics)
+    )
+    return res.json()["file"]
+
+
+def release_task(
+    boilerplate_client: BailoBoilerplateClient,
+    model_id: str,
+    version: str,
+    notes: str,
+    model_card_version: int,
+    file_ids: list[str] | None = None,
+    images: list[dict[str, str]] | None = None,
+    minor: bool = False,
+    draft: bool = False,
+) -> str:
+    """Create a release.
+
+    :param boilerplate_client: Worker's client.
+    :param model_id: Model to create the release in.
+    :param version: Release semver.
+    :param notes: Release notes.
+    :param model_card_version: Model card version to release.
+    :param file_ids: File IDs to include, defaults to None.
+    :param images: Images to include, defaults to None.
+    :param minor: Whether this is a minor release, defaults to False.
+    :param draft: Whether this is a draft release, defaults to False.
+    :return: The created release version.
+    """
+    Release.create(
+        boilerplate_client.client,
+        model_id,
+        version,
+        notes,
+        model_card_version,
+        files=file_ids,
+        images=images,
+        minor=minor,
+        draft=draft,
+    )
+    return str(version)
+
+
+def delete_file_task(boilerplate_client: BailoBoilerplateClient, model_id: str, file_id: str) -> str:
+    """Delete a file.
+
+    :param boilerplate_client: Worker's client.
+    :param model_id: Model the file belongs to.
+    :param file_id: File to delete.
+    :return: The deleted file ID.
+    """
+    boilerplate_client.client.delete_file(model_id, file_id)
+    return file_id
+
+
+def delete_release_task(boilerplate_client: BailoBoilerplateClient, model_id: str, version: str) -> str:
+    """Delete a release.
+
+    :param boilerplate_client: Worker's client.
+    :param model_id: Model the release belongs to.
+    :param version: Release semver to delete.
+    :return: The deleted release version.
+    """
+    boilerplate_client.client.delete_release(model_id, version)
+    return version
+
+
+def delete_model_task(boilerplate_client: BailoBoilerplateClient, model_id: str) -> str:
+    """Delete a model and all of its artefacts.
+
+    :param boilerplate_client: Worker's client.
+    :param model_id: Model to delete.
+    :return: The deleted model ID.
+    """
+    boilerplate_client.client.delete_model(model_id)
+    return model_id
@@ -0,0 +1,86 @@
+"""Benchmark the per-call cost of matching client endpoints against increasingly large OpenAPI specifications.
+
+Builds a synthetic specification and a synthetic client with one `self.agent.<method>(f"...")` call per endpoint, then
+times how long each call takes to match. The per-call cost should stay flat as the specification grows.
+
+```bash
+python -m bailo_openapi_linter.benchmark_route_matcher
+```
+"""
+
+from __future__ import annotations
+
+import time
+
+import astroid
+from astroid import nodes
+
+from bailo_openapi_linter.openapi_checker import get_path_segments, match_path
+from bailo_openapi_linter.route_matcher import RouteMatcher
+
+SPEC_SIZES = [100, 1_000, 10_000]
+HTTP_METHODS = ["get", "post", "put", "patch", "delete"]
+REPEATS = 5
+
+
+def generate_spec_paths(endpoint_count: int) -> list[tuple[str, str]]:
+    """Generate `endpoint_count` unique (method, path) pairs shaped like Bailo's API.
+
+    :param endpoint_count: Number of endpoints to generate.
+    :return: List of (HTTP method, OpenAPI path) pairs.
+    """
+    return [
+        (
+            HTTP_METHODS[index % len(HTTP_METHODS)],
+            f"/api/v2/resource{index // 10}/{{resourceId}}/sub{index % 10}/{{subId}}/action{index}",
+        )
+        for index in range(endpoint_count)
+    ]
+
+
+def generate_client_source(spec_paths: list[tuple[str, str]]) -> str:
+    """Generate a client class with one agent call per endpoint, including query strings and mixed f-string parameters.
+
+    :param spec_paths: List of (HTTP method, OpenAPI path) pairs to call.
+    :return: Python source of the synthetic client.
+    """
+    lines = ["class Client:", "    def call_all(self, resource_id, sub_id, query):"]
+    for index, (http_method, path) in enumerate(spec_paths):
+        client_path = (
+            path.removeprefix("/api")
+            .replace("{resourceId}", "{resource_id}")
+            .replace("{subId}", "prefix-{sub_id}" if index % 2 else "{sub_id}")
+        )
+        lines.append(f'        self.agent.{http_method}(f"{{self.url}}{client_path}?q={{query}}")')
+    return "\n".join(lines)
+
+
+def benchmark(endpoint_count: int) -> tuple[float, int]:
+    """Time matching every call in a synthetic client against a specification of `endpoint_count` endpoints.
+
+    :param endpoint_count: Number of endpoints in both the specification and the client.
+    :return: Tuple of (best per-call time in microseconds, number of calls matched).
+    """
+    spec_paths = generate_spec_paths(endpoint_count)
+    route_matcher = RouteMatcher()
+    for http_method, path in spec_paths:
+        route_matcher.add(http_method, path)
+    calls = list(astroid.parse(generate_client_source(spec_paths)).nodes_of_class(nodes.Call))
+
+    best = float("inf")
+    matched = 0
+    for _ in range(REPEATS):
+        matched = 0
+        start = time.perf_counter()
+        for call in calls:
+            if match_path(route_matcher, call.func.repr_name(), get_path_segments(call.args[0])) is not None:
+                matched += 1
+        best = min(best, (time.perf_counter() - start) / len(calls))
+    return best * 1_000_000, matched
+
+
+if __name__ == "__main__":
+    print(f"{'endpoints':>10} {'matched':>10} {'us/call':>10}")
+    for spec_size in SPEC_SIZES:
+        per_call, matched_count = benchmark(spec_size)
+        print(f"{spec_size:>10_} {matched_count:>10_} {per_call:>10.2f}")
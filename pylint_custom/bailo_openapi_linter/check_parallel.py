@@ -0,0 +1,76 @@
+"""Check that a parallel run of the checker reports each message exactly once, and the same messages as one process.
+
+Pylint workers load plugins again after receiving a copy of the main linter, so a checker registered twice on the same
+linter would report each of its messages twice. Like the checker itself, this requires Bailo's OpenAPI specification at
+`http://localhost:8080`:
+
+```bash
+python -m bailo_openapi_linter.check_parallel <path/to/bailo/lib/python/src/bailo/>
+```
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from collections import Counter
+
+JOBS = 2
+
+
+def get_messages(path: str, jobs: int) -> Counter[tuple[str, int, str, str]]:
+    """Run the checker over `path` and count each message it reports.
+
+    :param path: Module or package to check.
+    :param jobs: Number of pylint processes.
+    :return: Count of each (path, line, message ID, message).
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "pylint",
+            "--load-plugins=bailo_openapi_linter.openapi_checker",
+            "--disable=all",
+            "--enable=endpoint-not-covered,endpoint-unknown",
+            "--output-format=json",
+            f"--jobs={jobs}",
+            path,
+        ],
+        capture_output=True,
+        check=False,
+        text=True,
+    )
+    return Counter(
+        (message["path"], message["line"], message["message-id"], message["message"])
+        for message in json.loads(result.stdout or "[]")
+    )
+
+
+def check(path: str, jobs: int = JOBS) -> list[str]:
+    """Compare the messages of a parallel run with those of a single process run.
+
+    :param path: Module or package to check.
+    :param jobs: Number of pylint processes in the parallel run, defaults to JOBS.
+    :return: Description of each problem found, empty if the parallel run reported each message exactly once.
+    """
+    single = get_messages(path, 1)
+    parallel = get_messages(path, jobs)
+    problems = [
+        f"reported {count} times with --jobs={jobs}: {message}" for message, count in parallel.items() if count > 1
+    ]
+    problems += [f"missing with --jobs={jobs}: {message}" for message in single.keys() - parallel.keys()]
+    problems += [f"only reported with --jobs={jobs}: {message}" for message in parallel.keys() - single.keys()]
+    return problems
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m bailo_openapi_linter.check_parallel <path>")
+    found_problems = check(sys.argv[1])
+    for problem in found_problems:
+        print(problem)
+    if found_problems:
+        sys.exit(1)
+    print(f"Each message was reported exactly once with --jobs={JOBS}")
@@ -2,23 +2,28 @@
 
 from __future__ import annotations
 
-import re
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import requests
 from astroid import nodes
 from pylint.checkers import BaseChecker
+from pylint.constants import WarningScope
+
+from bailo_openapi_linter.route_matcher import WILDCARD, RouteMatcher
 
 if TYPE_CHECKING:
     from pylint.lint import PyLinter
 
+CLIENT_MODULE = "bailo.core.client"
+
 
 class OpenAPISpecChecker(BaseChecker):
     """Compare the Bailo Python client implementation's coverage of the OpenAPI spec."""
 
     name = "OpenAPISpecCoverage"
     msgs = {
-        "W9001": ("Endpoint not covered: %s", "endpoint-not-covered", ""),
+        # reported once every module has been checked, so against a line of the client module rather than a node
+        "W9001": ("Endpoint not covered: %s", "endpoint-not-covered", "", {"scope": WarningScope.LINE}),
         "E9001": ("Endpoint not found in specification: %s", "endpoint-unknown", ""),
     }
 
@@ -30,11 +35,13 @@ class OpenAPISpecChecker(BaseChecker):
         )
         self._openapi_response = r.json()
         self.paths_to_check = {}
+        # (module name, file path) of the client module, once it has been checked
+        self._client_module: tuple[str, str] | None = None
+        self._route_matcher = RouteMatcher()
         for path in self._openapi_response.get("paths").keys():
             http_methods = self._openapi_response.get("paths")[path].keys()
-            formatted_path = re.sub(r"{[^}]*}", "*", path)
             for http_method in http_methods:
-                self.paths_to_check[f"{http_method}:{formatted_path}"] = False
+                self.paths_to_check[self._route_matcher.add(http_method, path)] = False
 
     def visit_call(self, node: nodes.Call):
         """Check if a Call node matches `self.agent.<method>(<url>)` and update the dict of found endpoints accordingly.
@@ -50,39 +57,124 @@ class OpenAPISpecChecker(BaseChecker):
         ):
             http_method = node.func.repr_name()
             for arg in node.args:
-                if isinstance(arg, nodes.JoinedStr):
-                    # format endpoint to match openapi spec
-                    path = "".join(
-                        [
-                            (
-                                "/api"
-                                if index == 0 and isinstance(arg_part, nodes.FormattedValue)
-                                else arg_part.value if isinstance(arg_part, nodes.Const) else "*"
-                            )
-                            for index, arg_part in enumerate(arg.values)
-                        ]
-                    )
-                    path_to_check = f"{http_method}:{path}"
-                    if path_to_check in self.paths_to_check:
-                        # update endpoint dict
-                        self.paths_to_check[path_to_check] = True
-                    else:
-                        # unknown endpoint found
-                        self.add_message("endpoint-unknown", node=node, args=path_to_check)
+                candidates = get_path_segments(arg)
+                if candidates is None:
+                    continue
+                route = match_path(self._route_matcher, http_method, candidates)
+                if route is not None:
+                    # update endpoint dict
+                    self.paths_to_check[route] = True
+                else:
+                    # unknown endpoint found
+                    path = "/" + "/".join("*" if segment is WILDCARD else segment for segment in candidates[0])
+                    self.add_message("endpoint-unknown", node=node, args=f"{http_method}:{path}")
 
     def leave_module(self, node: nodes.Module) -> None:
-        """Check if the module was the expected one, and if so list the endpoints that were not found.
+        """Check if the module was the expected one, and if so record it so that the endpoints that were not found can
+        be reported against it once every module has been checked.
 
         :param node: Module to check.
         """
-        if node.repr_name() == "bailo.core.client":
-            for path in [path for path, covered in self.paths_to_check.items() if not covered]:
-                self.add_message("endpoint-not-covered", node=node, args=path)
+        if node.repr_name() == CLIENT_MODULE:
+            self._client_module = (node.repr_name(), node.file)
+
+    def close(self) -> None:
+        """List the endpoints that were not found after a single process run (`--jobs=1`).
+        Parallel runs instead report from `reduce_map_data` once every worker's coverage has been merged.
+        """
+        if self.linter.config.from_stdin or self.linter.config.jobs <= 1:
+            self._report_uncovered()
+
+    def get_map_data(self) -> dict[str, Any]:
+        """Collect this worker's coverage. This is cumulative across every module the worker has checked.
+
+        :return: Covered endpoints and the client module if this worker checked it.
+        """
+        return {
+            "covered": [path for path, covered in self.paths_to_check.items() if covered],
+            "client_module": self._client_module,
+        }
+
+    def reduce_map_data(self, linter: PyLinter, data: list[dict[str, Any]]) -> None:
+        """Merge the coverage from every worker, then list the endpoints that were not found by any of them.
+
+        :param linter: The main process linter.
+        :param data: `get_map_data` results from every worker.
+        """
+        for worker_data in data:
+            for path in worker_data["covered"]:
+                if path in self.paths_to_check:
+                    self.paths_to_check[path] = True
+            if worker_data["client_module"] is not None:
+                self._client_module = tuple(worker_data["client_module"])
+        self._report_uncovered()
+
+    def _report_uncovered(self) -> None:
+        """Add a message against the client module for each endpoint that was not found."""
+        if self._client_module is None:
+            return
+        self.linter.set_current_module(*self._client_module)
+        for path in [path for path, covered in self.paths_to_check.items() if not covered]:
+            self.add_message("endpoint-not-covered", line=1, args=path)
+
+
+def get_path_segments(arg: nodes.NodeNG) -> list[list[str | None]] | None:
+    """Convert a URL argument into path segments to match against the OpenAPI spec.
+
+    A leading `FormattedValue` (i.e. `self.url`) becomes `/api`, and any other segment containing a `FormattedValue`
+    becomes a wildcard. Query strings and fragments are dropped. As a `FormattedValue` at the end of the last segment
+    may be a query string or fragment (e.g. `files{query}`), such a segment is first tried as just its literal prefix.
+
+    :param arg: Argument node of the call.
+    :return: Candidate lists of segments with `WILDCARD` for dynamic segments, in the order they should be tried, or
+        None if the argument is not an f-string.
+    """
+    if not isinstance(arg, nodes.JoinedStr):
+        return None
+
+    # build the path with a placeholder for each dynamic part, then split on it
+    placeholder = "\x00"
+    path = "".join(
+        [
+            (
+                "/api"
+                if index == 0 and isinstance(arg_part, nodes.FormattedValue)
+                else arg_part.value if isinstance(arg_part, nodes.Const) else placeholder
+            )
+            for index, arg_part in enumerate(arg.values)
+        ]
+    )
+    segments = RouteMatcher.split_path(path)
+    candidates = [[WILDCARD if placeholder in segment else segment for segment in segments]]
+    if segments and segments[-1].endswith(placeholder):
+        prefix = segments[-1].split(placeholder, 1)[0]
+        if prefix:
+            candidates.insert(0, candidates[0][:-1] + [prefix])
+    return candidates
+
+
+def match_path(route_matcher: RouteMatcher, http_method: str, candidates: list[list[str | None]]) -> str | None:
+    """Match the first candidate from `get_path_segments` that is in the specification.
+
+    :param route_matcher: Specification paths.
+    :param http_method: HTTP method of the call.
+    :param candidates: Candidate lists of segments, in the order they should be tried.
+    :return: Key of the matching specification path, or None if no candidate matches.
+    """
+    for segments in candidates:
+        route = route_matcher.match(http_method, segments)
+        if route is not None:
+            return route
+    return None
 
 
 def register(linter: PyLinter) -> None:
     """This required method auto registers the checker during initialization.
+    Parallel workers load plugins again onto a copy of the main linter which already has the checker, so it is only
+    registered once per linter to avoid reporting every message twice.
 
     :param linter: The linter to register the checker to.
     """
+    if any(isinstance(checker, OpenAPISpecChecker) for checker in linter.get_checkers()):
+        return
     linter.register_checker(OpenAPISpecChecker(linter))
@@ -0,0 +1,102 @@
+"""Per-method segment trie used to match client endpoints against OpenAPI specification paths."""
+
+from __future__ import annotations
+
+import re
+
+# Marks a segment whose value is only known at runtime (e.g. an f-string `FormattedValue`).
+WILDCARD = None
+
+_PARAMETER_REGEX = re.compile(r"{[^}]*}")
+
+
+class _RouteNode:
+    """Single path segment within a `RouteMatcher` trie."""
+
+    __slots__ = ("literals", "parameter", "route")
+
+    def __init__(self) -> None:
+        self.literals: dict[str, _RouteNode] = {}
+        self.parameter: _RouteNode | None = None
+        self.route: str | None = None
+
+
+class RouteMatcher:
+    """Compile OpenAPI specification paths into one segment trie per HTTP method.
+
+    Literal segments are looked up with a dict, and any segment containing a `{parameter}` becomes a single wildcard
+    child, so matching a fully literal path costs O(segments) regardless of how many paths are in the specification.
+    """
+
+    def __init__(self) -> None:
+        self._roots: dict[str, _RouteNode] = {}
+
+    @staticmethod
+    def route_key(http_method: str, spec_path: str) -> str:
+        """Format the key used to report a specification path, e.g. `get:/api/v2/model/*`.
+
+        :param http_method: HTTP method of the path.
+        :param spec_path: Path as written in the OpenAPI specification.
+        :return: The formatted key.
+        """
+        return f"{http_method.lower()}:{_PARAMETER_REGEX.sub('*', spec_path)}"
+
+    @staticmethod
+    def split_path(path: str) -> list[str]:
+        """Split a URL path into its non-empty segments, ignoring any query string or fragment.
+
+        :param path: URL path to split.
+        :return: List of segments.
+        """
+        path = path.split("#", 1)[0].split("?", 1)[0]
+        return [segment for segment in path.split("/") if segment]
+
+    def add(self, http_method: str, spec_path: str) -> str:
+        """Add a specification path to the trie.
+
+        :param http_method: HTTP method of the path.
+        :param spec_path: Path as written in the OpenAPI specification.
+        :return: The key that `match` will return for this path.
+        """
+        node = self._roots.setdefault(http_method.lower(), _RouteNode())
+        for segment in self.split_path(spec_path):
+            if _PARAMETER_REGEX.search(segment):
+                if node.parameter is None:
+                    node.parameter = _RouteNode()
+                node = node.parameter
+            else:
+                node = node.literals.setdefault(segment, _RouteNode())
+        node.route = self.route_key(http_method, spec_path)
+        return node.route
+
+    def match(self, http_method: str, segments: list[str | None]) -> str | None:
+        """Find the specification path matching a client path.
+
+        Literal client segments prefer a literal child over a parameter child. `WILDCARD` client segments only match a
+        parameter child, as a value only known at runtime cannot be shown to equal a literal segment of the
+        specification, so they never cover a literal path or cause backtracking.
+
+        :param http_method: HTTP method of the call.
+        :param segments: Client path segments, with `WILDCARD` for any segment only known at runtime.
+        :return: Key of the matching specification path, or None if nothing matches.
+        """
+        root = self._roots.get(http_method.lower())
+        if root is None:
+            return None
+
+        stack = [(root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if depth == len(segments):
+                if node.route is not None:
+                    return node.route
+                continue
+            segment = segments[depth]
+            # push in reverse order of preference as the stack is LIFO
+            if node.parameter is not None:
+                stack.append((node.parameter, depth + 1))
+            if segment is not WILDCARD:
+                child = node.literals.get(segment)
+                if child is not None:
+                    stack.append((child, depth + 1))
+        return None